@@ -0,0 +1,137 @@
+"""
+Anchor Embedding Cache for The Polar Emotion Compass
+=====================================================
+Persists encoded emotion anchors so process start-up skips re-encoding them.
+
+Layout (one pair of files per model + anchor set):
+- anchors-<key>.npy  : float32 matrix of shape (n_anchors, embedding_dim)
+- anchors-<key>.json : manifest with model name, embedding dimension and
+                       a content hash of the anchor labels
+
+Cached matrices are opened with `mmap_mode="r"`, so every worker process on
+a host reads the same page-cache copy instead of holding its own.
+Files are written to a temp name and renamed into place, so concurrent
+workers racing to build the cache never see a half-written file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+MANIFEST_VERSION = 1
+
+
+def labels_hash(anchors: list[str]) -> str:
+    """Content hash of the ordered anchor texts."""
+    digest = hashlib.sha256()
+    for anchor in anchors:
+        digest.update(anchor.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _cache_paths(cache_dir: str, model_name: str, anchors: list[str]) -> tuple[str, str]:
+    """Return (npy_path, manifest_path) for a model + anchor set."""
+    key = hashlib.sha256(f"{model_name}\0{labels_hash(anchors)}".encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"anchors-{key}")
+    return base + ".npy", base + ".json"
+
+
+def _atomic_write(path: str, write_fn) -> None:
+    """Write via a temp file in the same directory, then rename into place."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_anchor_embeddings(
+    cache_dir: str,
+    model_name: str,
+    anchors: list[str],
+    embedding_dim: int,
+) -> np.ndarray | None:
+    """
+    Memory-map cached anchor embeddings if they match the model and labels.
+
+    Args:
+        cache_dir: Directory holding the cache files
+        model_name: Model the embeddings must have been produced by
+        anchors: Anchor texts, in the order rows are expected
+        embedding_dim: Embedding dimension of the loaded model
+
+    Returns:
+        Read-only float32 memmap of shape (n_anchors, embedding_dim),
+        or None if there is no valid cache entry
+    """
+    npy_path, manifest_path = _cache_paths(cache_dir, model_name, anchors)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    expected = {
+        "version": MANIFEST_VERSION,
+        "model_name": model_name,
+        "embedding_dim": embedding_dim,
+        "n_anchors": len(anchors),
+        "labels_hash": labels_hash(anchors),
+    }
+    if any(manifest.get(k) != v for k, v in expected.items()):
+        return None
+
+    try:
+        embeddings = np.load(npy_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if embeddings.dtype != np.float32 or embeddings.shape != (len(anchors), embedding_dim):
+        return None
+    return embeddings
+
+
+def save_anchor_embeddings(
+    cache_dir: str,
+    model_name: str,
+    anchors: list[str],
+    embeddings: np.ndarray,
+) -> str:
+    """
+    Write anchor embeddings and their manifest to the cache.
+
+    The .npy is written before the manifest, so a manifest only ever points
+    at a complete matrix.
+
+    Args:
+        cache_dir: Directory holding the cache files (created if missing)
+        model_name: Model that produced the embeddings
+        anchors: Anchor texts, one per row of `embeddings`
+        embeddings: Array of shape (n_anchors, embedding_dim)
+
+    Returns:
+        Path of the written .npy file
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    npy_path, manifest_path = _cache_paths(cache_dir, model_name, anchors)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "model_name": model_name,
+        "embedding_dim": int(embeddings.shape[1]),
+        "n_anchors": int(embeddings.shape[0]),
+        "labels_hash": labels_hash(anchors),
+        "dtype": "float32",
+    }
+    _atomic_write(npy_path, lambda f: np.save(f, embeddings))
+    _atomic_write(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+    return npy_path
@@ -0,0 +1,334 @@
+"""
+Exemplar Anchor Index for The Polar Emotion Compass
+====================================================
+Represents each emotion by many curated exemplar phrases instead of a
+single lowercase word, and scores sentences against the whole bank.
+
+Key Features:
+- Blocked float32 index: exemplars sorted by emotion into one contiguous
+  unit-length matrix, scored block by block so the temporary similarity
+  matrix stays small however large the bank grows
+- Per-emotion pooling over exemplars ("max" or "mean") with `reduceat`,
+  producing the (n_sentences, n_emotions) matrix the engine already blends
+- Optional centroid probing: only the `probe` most promising emotions are
+  searched exhaustively, so latency grows with bank size / n_emotions * probe
+- `argpartition`-based top-k exemplar search (explains which phrases matched)
+- Save / memory-map precomputed exemplar embeddings from disk
+
+Layout:
+- exemplars.npy  : float32 (n_exemplars, embedding_dim), unit rows, grouped by emotion
+- exemplars.json : manifest with model name, emotion labels, per-emotion counts
+                   and (optionally) the exemplar texts
+
+Usage:
+    python anchor_index.py exemplars.json --output exemplar_bank/
+    engine = ValenceEngine(exemplar_index="exemplar_bank/")
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from anchor_cache import _atomic_write
+
+INDEX_VERSION = 1
+BLOCK_SIZE = 8192           # Exemplar rows scored per matmul
+POOLING_MODES = ("max", "mean")
+
+
+class ExemplarIndex:
+    """
+    Pooled similarity search over an exemplar bank.
+
+    Args:
+        embeddings: (n_exemplars, dim) float32 rows grouped by emotion
+            (normalised here unless `normalized=True`)
+        counts: Number of exemplars per emotion, in `labels` order
+        labels: Emotion label of each group
+        pooling: "max" (closest exemplar) or "mean" (average over exemplars)
+        block_size: Exemplar rows per matmul block
+        probe: Emotions searched exhaustively per call (None searches all)
+        normalized: Rows are already unit length (e.g. a memory-mapped file)
+        texts: Optional exemplar texts, for `top_k` explanations
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        counts: list[int],
+        labels: list[str],
+        pooling: str = "max",
+        block_size: int = BLOCK_SIZE,
+        probe: int | None = None,
+        normalized: bool = False,
+        texts: list[str] | None = None,
+    ):
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Unknown pooling {pooling!r}; expected one of {POOLING_MODES}")
+        if len(counts) != len(labels) or sum(counts) != len(embeddings):
+            raise ValueError("counts must give one exemplar count per label, summing to the number of rows")
+
+        if not normalized:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.embeddings = embeddings
+        self.labels = list(labels)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.pooling = pooling
+        self.block_size = block_size
+        self.probe = probe
+        self.texts = texts
+
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)])
+        # Emotion of every row, for mapping block boundaries to emotions
+        self.row_emotion = np.repeat(np.arange(len(labels)), self.counts)
+
+        # Unit-length centroids, used to pick candidate emotions when probing
+        centroids = np.zeros((len(labels), embeddings.shape[1]), dtype=np.float32)
+        for e in np.flatnonzero(self.counts):
+            centroids[e] = np.asarray(embeddings[self.starts[e]:self.starts[e + 1]]).mean(axis=0)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = np.divide(centroids, norms, out=np.zeros_like(centroids), where=norms > 0)
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.embeddings.nbytes)
+
+    def _pool(self, sims: np.ndarray, local_starts: np.ndarray) -> np.ndarray:
+        if self.pooling == "max":
+            return np.maximum.reduceat(sims, local_starts, axis=1)
+        return np.add.reduceat(sims, local_starts, axis=1)
+
+    def _scores_exhaustive(self, unit: np.ndarray, out: np.ndarray) -> None:
+        for b0 in range(0, len(self.embeddings), self.block_size):
+            b1 = min(b0 + self.block_size, len(self.embeddings))
+            sims = unit @ np.asarray(self.embeddings[b0:b1]).T
+            # Emotions overlapping this block, and where each starts inside it
+            emotions = np.unique(self.row_emotion[b0:b1])
+            local_starts = np.maximum(self.starts[emotions], b0) - b0
+            pooled = self._pool(sims, local_starts)
+            if self.pooling == "max":
+                np.maximum(out[:, emotions], pooled, out=pooled)
+                out[:, emotions] = pooled
+            else:
+                out[:, emotions] += pooled
+
+    def _scores_probed(self, unit: np.ndarray, out: np.ndarray) -> None:
+        centroid_scores = unit @ self.centroids.T
+        k = min(self.probe, len(self.labels))
+        top = np.argpartition(-centroid_scores, k - 1, axis=1)[:, :k]
+        probed = np.zeros(centroid_scores.shape, dtype=bool)
+        np.put_along_axis(probed, top, True, axis=1)
+        # Each emotion's exemplars are scored only against the sentences that probed it
+        for e in np.flatnonzero(probed.any(axis=0) & (self.counts > 0)):
+            rows = np.flatnonzero(probed[:, e])
+            sims = unit[rows] @ np.asarray(self.embeddings[self.starts[e]:self.starts[e + 1]]).T
+            out[rows, e] = sims.max(axis=1) if self.pooling == "max" else sims.mean(axis=1)
+
+    def scores(self, sentence_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Pooled similarity of each sentence to each emotion.
+
+        Emotions without exemplars (or not probed) score -inf, so they can
+        never win the Top-2 selection.
+
+        Args:
+            sentence_embeddings: (n_sentences, dim) array
+
+        Returns:
+            (n_sentences, n_emotions) float32 array, in `labels` order
+        """
+        unit = np.asarray(sentence_embeddings, dtype=np.float32)
+        unit = unit / np.linalg.norm(unit, axis=1, keepdims=True)
+
+        exhaustive_mean = self.pooling == "mean" and not self.probe
+        out = np.full((len(unit), len(self.labels)), 0.0 if exhaustive_mean else -np.inf, dtype=np.float32)
+        if len(unit) == 0:
+            return out
+
+        if self.probe:
+            self._scores_probed(unit, out)
+        else:
+            self._scores_exhaustive(unit, out)
+
+        if exhaustive_mean:
+            populated = self.counts > 0
+            out[:, populated] /= self.counts[populated]
+            out[:, ~populated] = -np.inf
+        return out
+
+    def top_k(self, sentence_embeddings: np.ndarray, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The k nearest exemplars of each sentence.
+
+        Args:
+            sentence_embeddings: (n_sentences, dim) array
+            k: Exemplars returned per sentence
+
+        Returns:
+            (indices, scores), both (n_sentences, k), best first
+        """
+        unit = np.asarray(sentence_embeddings, dtype=np.float32)
+        unit = unit / np.linalg.norm(unit, axis=1, keepdims=True)
+        k = min(k, len(self.embeddings))
+
+        best_idx = np.empty((len(unit), 0), dtype=np.int64)
+        best_scores = np.empty((len(unit), 0), dtype=np.float32)
+        for b0 in range(0, len(self.embeddings), self.block_size):
+            sims = unit @ np.asarray(self.embeddings[b0:b0 + self.block_size]).T
+            kk = min(k, sims.shape[1])
+            part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+            # Merge this block's candidates with the running best k
+            cand_idx = np.concatenate([best_idx, part + b0], axis=1)
+            cand_scores = np.concatenate([best_scores, np.take_along_axis(sims, part, axis=1)], axis=1)
+            keep = np.argpartition(-cand_scores, min(k, cand_scores.shape[1]) - 1, axis=1)[:, :k]
+            best_idx = np.take_along_axis(cand_idx, keep, axis=1)
+            best_scores = np.take_along_axis(cand_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_idx, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def aligned_to(self, emotion_labels: list[str]) -> np.ndarray:
+        """Column indices mapping `emotion_labels` onto this index (-1 if absent)."""
+        position = {label: i for i, label in enumerate(self.labels)}
+        return np.array([position.get(label, -1) for label in emotion_labels], dtype=np.int64)
+
+
+# ----------------------------------------------------------------------
+# Disk format
+# ----------------------------------------------------------------------
+
+def _paths(directory: str) -> tuple[str, str]:
+    return os.path.join(directory, "exemplars.npy"), os.path.join(directory, "exemplars.json")
+
+
+def save_exemplar_index(
+    directory: str,
+    exemplars: dict[str, np.ndarray],
+    model_name: str,
+    texts: dict[str, list[str]] | None = None,
+) -> str:
+    """
+    Write exemplar embeddings grouped by emotion.
+
+    Args:
+        directory: Output directory (created if missing)
+        exemplars: Emotion label -> (n_exemplars, dim) embeddings
+        model_name: Model that produced the embeddings
+        texts: Optional emotion label -> exemplar phrases (same order)
+
+    Returns:
+        Path of the written .npy file
+    """
+    os.makedirs(directory, exist_ok=True)
+    npy_path, manifest_path = _paths(directory)
+
+    labels = list(exemplars)
+    matrix = np.concatenate([np.asarray(exemplars[label], dtype=np.float32) for label in labels])
+    matrix = np.ascontiguousarray(matrix / np.linalg.norm(matrix, axis=1, keepdims=True))
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "model_name": model_name,
+        "embedding_dim": int(matrix.shape[1]),
+        "labels": labels,
+        "counts": [int(len(exemplars[label])) for label in labels],
+        "dtype": "float32",
+    }
+    if texts is not None:
+        manifest["texts"] = [t for label in labels for t in texts[label]]
+    _atomic_write(npy_path, lambda f: np.save(f, matrix))
+    _atomic_write(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+    return npy_path
+
+
+def load_exemplar_index(
+    directory: str,
+    model_name: str | None = None,
+    pooling: str = "max",
+    probe: int | None = None,
+    block_size: int = BLOCK_SIZE,
+) -> ExemplarIndex:
+    """
+    Memory-map a saved exemplar bank.
+
+    Args:
+        directory: Directory written by `save_exemplar_index`
+        model_name: If given, the bank must have been built with this model
+        pooling: "max" or "mean"
+        probe: Emotions searched exhaustively per call (None searches all)
+        block_size: Exemplar rows per matmul block
+
+    Returns:
+        ExemplarIndex over a read-only memmap
+    """
+    npy_path, manifest_path = _paths(directory)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != INDEX_VERSION:
+        raise ValueError(f"Unsupported exemplar index version in {manifest_path}")
+    if model_name is not None and manifest["model_name"] != model_name:
+        raise ValueError(f"Exemplar index was built with {manifest['model_name']!r}, not {model_name!r}")
+
+    embeddings = np.load(npy_path, mmap_mode="r")
+    return ExemplarIndex(
+        embeddings,
+        manifest["counts"],
+        manifest["labels"],
+        pooling=pooling,
+        block_size=block_size,
+        probe=probe,
+        normalized=True,
+        texts=manifest.get("texts"),
+    )
+
+
+def build_exemplar_index(engine, phrases: dict[str, list[str]], directory: str) -> ExemplarIndex:
+    """
+    Encode exemplar phrases with `engine`'s model and save the bank.
+
+    Args:
+        engine: Loaded (or loadable) ValenceEngine
+        phrases: Emotion label -> exemplar phrases
+        directory: Output directory
+
+    Returns:
+        The saved index, memory-mapped back from disk
+    """
+    phrases = {label: list(p) for label, p in phrases.items() if p}
+    exemplars = {label: engine.encode_sentences(p) for label, p in phrases.items()}
+    save_exemplar_index(directory, exemplars, engine.model_name, texts=phrases)
+    return load_exemplar_index(directory, engine.model_name)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from valence_engine import ENCODER_BACKENDS, MODEL_NAME, ValenceEngine
+
+    parser = argparse.ArgumentParser(description="Encode exemplar phrases into an on-disk anchor bank.")
+    parser.add_argument("phrases", help='JSON file: {"Happy": ["phrase", ...], ...}')
+    parser.add_argument("--output", required=True, help="Directory for exemplars.npy / exemplars.json")
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS)
+    args = parser.parse_args(argv)
+
+    with open(args.phrases, "r", encoding="utf-8") as f:
+        phrases = json.load(f)
+    engine = ValenceEngine(model_name=args.model, backend=args.backend).load()
+    unknown = sorted(set(phrases) - set(engine.emotion_labels))
+    if unknown:
+        print(f"Error: unknown emotions in {args.phrases}: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    index = build_exemplar_index(engine, phrases, args.output)
+    print(f"Saved {len(index)} exemplars for {int(np.count_nonzero(index.counts))} emotions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
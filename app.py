@@ -5,11 +5,13 @@ Zoomed-in polar scatter with clickable emotion bubbles.
 """
 
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-from datetime import datetime
-from valence_engine import calculate_polar_coordinates
+from datetime import datetime, timedelta
+from valence_engine import DraftScorer
+from engine_pool import EnginePool
 from emotion_map import EMOTION_MAP
+from wheel import new_wheel_figure, set_highlight, set_history
+from journal_store import JournalStore
 
 # PAGE CONFIGURATION
 st.set_page_config(
@@ -36,6 +38,28 @@ if "selected_emotion" not in st.session_state:
     st.session_state["selected_emotion"] = "Neutral"
 
 # HELPERS
+@st.cache_resource
+def get_pool():
+    """Shared engine, loaded and warmed up in the background from the first page view."""
+    return EnginePool(replicas=1).start()
+
+def get_engine():
+    """Shared ValenceEngine for all sessions."""
+    return get_pool().engines[0]
+
+@st.cache_resource
+def get_store():
+    """Local journal database shared by all sessions."""
+    return JournalStore()
+
+def get_draft_scorer(engine):
+    """Per-session DraftScorer: re-logging an edited draft only encodes changed sentences."""
+    scorer = st.session_state.get("draft_scorer")
+    if scorer is None or scorer.engine is not engine:
+        scorer = DraftScorer(engine)
+        st.session_state["draft_scorer"] = scorer
+    return scorer
+
 def get_time_of_day():
     """Categorize current hour into time period."""
     hour = datetime.now().hour
@@ -48,24 +72,6 @@ def get_time_of_day():
     else:
         return "Night"
 
-# BUILD BUBBLE WHEEL DATAFRAME
-def build_wheel_df(selected_emotion):
-    """Convert EMOTION_MAP to a DataFrame with highlight color."""
-    rows = []
-    for emotion, data in EMOTION_MAP.items():
-        if emotion == "Neutral":
-            continue  # Skip neutral in the wheel
-        rows.append({
-            "emotion": emotion,
-            "radius": data["radius"],
-            "angle": data["angle"],
-            "energy": data["energy"],
-            "desc": data["desc"],
-            "color": "red" if emotion == selected_emotion else "lightblue",
-            "size": 10
-        })
-    return pd.DataFrame(rows)
-
 # MAIN APPLICATION
 st.title("The Polar Emotion Compass")
 st.markdown("**Interactive Bubble Wheel — click, zoom, and explore your emotions.**")
@@ -90,6 +96,7 @@ with col_input:
     st.markdown("---")
 
     st.subheader("Context")
+    patient = st.text_input("Patient ID", value="default", help="History is stored locally per patient.")
     ctx1, ctx2 = st.columns(2)
     with ctx1:
         theme = st.selectbox("Theme", ["Academic", "Freelance", "Relationships", "Health", "Other"])
@@ -107,14 +114,36 @@ with col_input:
 
     if st.button("Log Emotion", type="primary", use_container_width=True):
         if user_text and user_text.strip():
-            radius, angle, detected = calculate_polar_coordinates(user_text)
+            engine = get_engine()
+            if not get_pool().is_ready:
+                with st.spinner("Loading emotion model..."):
+                    # Falls through to a lazy load if background start-up failed
+                    get_pool().wait_ready()
+            scorer = get_draft_scorer(engine)
+            radius, angle, detected = scorer.calculate_polar_coordinates(user_text)
             st.session_state["selected_emotion"] = detected
+            meta = EMOTION_MAP.get(detected, {})
+
+            # Save to the local journal (embeddings the scorer already computed;
+            # none after a lexical fast-path hit)
+            get_store().append(
+                patient=patient.strip() or "default",
+                journal=user_text,
+                radius=radius,
+                angle=angle,
+                emotion=detected,
+                time_of_day=get_time_of_day(),
+                theme=theme,
+                location=location,
+                energy=meta.get("energy"),
+                model=engine.model_name,
+                sentence_embeddings=scorer.last_embeddings,
+            )
 
             # Display result
             if detected == "Neutral":
                 st.warning("Neutral — no strong emotion detected.")
             else:
-                meta = EMOTION_MAP.get(detected, {})
                 st.success(f"**{detected}** — {meta.get('desc', '')}")
                 st.caption(f"Intensity: {radius:.3f} | Angle: {angle:.1f}° | Energy: {meta.get('energy', 'N/A')}")
 
@@ -146,47 +175,25 @@ with col_input:
 with col_wheel:
     st.subheader("Emotion Bubble Wheel")
 
-    df = build_wheel_df(st.session_state["selected_emotion"])
-
-    fig = px.scatter_polar(
-        df,
-        r="radius",
-        theta="angle",
-        color="color",
-        color_discrete_map={"red": "crimson", "lightblue": "lightskyblue"},
-        size="size",
-        size_max=18,
-        hover_name="emotion",
-        hover_data={"energy": True, "desc": True, "color": False, "size": False, "radius": ":.2f", "angle": ":.0f"},
-    )
-
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                range=[0, 0.5],
-                showticklabels=True,
-                ticks="outside",
-                gridcolor="rgba(200,200,200,0.3)"
-            ),
-            angularaxis=dict(
-                direction="clockwise",
-                rotation=90,
-                tickmode="array",
-                tickvals=[0, 60, 120, 180, 240, 300],
-                ticktext=["Joy", "Anger", "Fear", "Sad", "Bad", "Peaceful"],
-                tickfont=dict(size=13)
-            ),
-            bgcolor="rgba(245,245,250,0.4)"
-        ),
-        showlegend=False,
-        height=700,
-        margin=dict(t=40, b=40),
-        paper_bgcolor="white"
-    )
-
-    fig.update_traces(
-        marker=dict(line=dict(width=1, color="DarkSlateGrey")),
-    )
+    # Static wheel is built once per session; reruns only move the overlays
+    if "wheel_fig" not in st.session_state:
+        st.session_state["wheel_fig"] = new_wheel_figure()
+    fig = set_highlight(st.session_state["wheel_fig"], st.session_state["selected_emotion"])
+
+    hist1, hist2 = st.columns(2)
+    with hist1:
+        show_history = st.checkbox("Show my history", value=False)
+    with hist2:
+        period = st.selectbox("Period", ["Last 7 days", "Last 30 days", "Last 90 days", "All time"], index=1,
+                              disabled=not show_history)
+    if show_history:
+        days = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}.get(period)
+        start = datetime.now() - timedelta(days=days) if days else None
+        history = get_store().query(patient=patient.strip() or "default", start=start)
+        set_history(fig, history)
+        st.caption(f"{len(history)} logged entries shown.")
+    else:
+        set_history(fig, None)
 
     st.plotly_chart(fig, use_container_width=True)
 
@@ -196,3 +203,44 @@ with col_wheel:
         st.info(f"**{sel}** — {meta['desc']}  \nEnergy: **{meta['energy']}** | Radius: {meta['radius']} | Angle: {meta['angle']}°")
     else:
         st.caption("Select or detect an emotion to highlight it on the wheel.")
+
+# SIDEBAR — Engine diagnostics (collapsed by default)
+with st.sidebar:
+    with st.expander("Diagnostics", expanded=False):
+        engine = get_engine()
+        st.caption("Engine: ready" if get_pool().is_ready else "Engine: warming up...")
+        engine.profiler.enabled = st.checkbox(
+            "Profile engine calls",
+            value=engine.profiler.enabled,
+            help="Record per-stage timings (split, encode, similarity, blend) for each call."
+        )
+        if st.button("Reset stats", use_container_width=True):
+            engine.profiler.reset()
+
+        stats = engine.profiling_stats()
+        if stats["metrics"]:
+            st.caption(f"Calls: {stats['calls']}")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "metric": name,
+                        "count": m["count"],
+                        "mean": round(m["mean"], 3),
+                        "p50": round(m["p50"], 3),
+                        "p95": round(m["p95"], 3),
+                        "max": round(m["max"], 3),
+                    }
+                    for name, m in stats["metrics"].items() if m["count"]
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption("Stage metrics in ms; sentences/tokens are per-call counts.")
+        else:
+            st.caption("No profiled calls yet.")
+
+        cache = engine.cache_stats()
+        st.caption(
+            f"Embedding cache hit rate: {cache['embeddings']['hit_rate']:.0%} | "
+            f"Result cache hit rate: {cache['results']['hit_rate']:.0%}"
+        )
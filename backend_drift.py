@@ -0,0 +1,177 @@
+"""
+Encoder Backend Drift Report for The Polar Emotion Compass
+===========================================================
+Runs a corpus through a reference backend (fp32) and a candidate backend
+(int8 / fp16) and reports how far the candidate's results drift.
+
+Reported per run:
+- Top-1 emotion label change rate (and Neutral <-> emotion flips)
+- Radius shift: mean / p95 / max absolute difference
+- Angle shift: mean / p95 / max shortest angular distance (degrees)
+- Wall time and entries/second for each backend
+
+Usage:
+    python backend_drift.py                          # corpus.py test cases, int8 vs fp32
+    python backend_drift.py --corpus exports.csv --candidate fp16 --json drift.json
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from valence_engine import ENCODER_BACKENDS, MODEL_NAME, ValenceEngine
+
+MAX_EXAMPLES = 10  # Changed-label examples listed in the report
+
+
+def load_corpus(path: str | None) -> list[str]:
+    """
+    Load journal texts for the report.
+
+    Args:
+        path: CSV with a `Journal` column, a text file with one entry per
+            line, or None for the `corpus.py` test cases
+
+    Returns:
+        List of journal texts
+    """
+    if path is None:
+        from corpus import TEST_CASES
+        return [case["text"] for case in TEST_CASES]
+    if path.lower().endswith(".csv"):
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return [row.get("Journal") or "" for row in csv.DictReader(f)]
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def _score(engine: ValenceEngine, texts: list[str]) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+    """Score `texts` and return (results, seconds), excluding model load time."""
+    engine.load()
+    start = time.perf_counter()
+    results = engine.calculate_polar_coordinates_batch(texts)
+    return results, time.perf_counter() - start
+
+
+def _summary(values: np.ndarray) -> dict:
+    if values.size == 0:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": float(np.mean(values)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(np.max(values)),
+    }
+
+
+def drift_report(
+    texts: list[str],
+    candidate: str = "int8",
+    reference: str = "fp32",
+    model_name: str = MODEL_NAME,
+) -> dict:
+    """
+    Compare two encoder backends over a corpus.
+
+    Result caches are disabled so both backends do the full encoding work.
+
+    Args:
+        texts: Journal texts to score
+        candidate: Backend under evaluation
+        reference: Backend treated as ground truth
+        model_name: sentence-transformers model name or path
+
+    Returns:
+        JSON-serialisable report dictionary
+    """
+    runs = {}
+    for backend in (reference, candidate):
+        engine = ValenceEngine(
+            model_name=model_name,
+            backend=backend,
+            embedding_cache_size=0,
+            result_cache_size=0,
+            persistent_cache=None,  # Both backends must actually score (ignore VALENCE_RESULT_CACHE)
+        )
+        runs[backend] = _score(engine, texts)
+
+    (ref_r, ref_a, ref_l), ref_time = runs[reference]
+    (cand_r, cand_a, cand_l), cand_time = runs[candidate]
+
+    changed = np.flatnonzero(ref_l != cand_l)
+    neutral_flips = int(np.sum((ref_l == "Neutral") != (cand_l == "Neutral")))
+
+    radius_shift = np.abs(cand_r - ref_r)
+    angle_shift = np.abs(cand_a - ref_a) % 360
+    angle_shift = np.minimum(angle_shift, 360 - angle_shift)
+
+    n = len(texts)
+    return {
+        "model": model_name,
+        "reference": reference,
+        "candidate": candidate,
+        "entries": n,
+        "label_changes": int(changed.size),
+        "label_change_rate": changed.size / n if n else 0.0,
+        "neutral_flips": neutral_flips,
+        "radius_shift": _summary(radius_shift),
+        "angle_shift_degrees": _summary(angle_shift),
+        "timing": {
+            reference: {"seconds": ref_time, "entries_per_s": n / ref_time if ref_time else 0.0},
+            candidate: {"seconds": cand_time, "entries_per_s": n / cand_time if cand_time else 0.0},
+            "speedup": ref_time / cand_time if cand_time else 0.0,
+        },
+        "examples": [
+            {"index": int(i), reference: ref_l[i], candidate: cand_l[i]}
+            for i in changed[:MAX_EXAMPLES]
+        ],
+    }
+
+
+def print_report(report: dict) -> None:
+    ref, cand = report["reference"], report["candidate"]
+    print("=" * 80)
+    print(f"ENCODER BACKEND DRIFT: {cand} vs {ref} ({report['model']})")
+    print("=" * 80)
+    print(f"Entries:          {report['entries']}")
+    print(f"Label changes:    {report['label_changes']} ({report['label_change_rate']:.2%})")
+    print(f"Neutral flips:    {report['neutral_flips']}")
+    r, a = report["radius_shift"], report["angle_shift_degrees"]
+    print(f"Radius shift:     mean={r['mean']:.4f}  p95={r['p95']:.4f}  max={r['max']:.4f}")
+    print(f"Angle shift (°):  mean={a['mean']:.2f}  p95={a['p95']:.2f}  max={a['max']:.2f}")
+    t = report["timing"]
+    print(f"Throughput:       {ref}={t[ref]['entries_per_s']:.1f}/s  {cand}={t[cand]['entries_per_s']:.1f}/s  "
+          f"speedup={t['speedup']:.2f}x")
+    for example in report["examples"]:
+        print(f"  entry {example['index']}: {example[ref]} -> {example[cand]}")
+    print("=" * 80)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare encoder backends over a journal corpus.")
+    parser.add_argument("--corpus", help="CSV (Journal column) or text file, one entry per line (default: corpus.py test cases)")
+    parser.add_argument("--candidate", default="int8", choices=ENCODER_BACKENDS)
+    parser.add_argument("--reference", default="fp32", choices=ENCODER_BACKENDS)
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        print("Error: corpus is empty", file=sys.stderr)
+        return 1
+
+    report = drift_report(texts, args.candidate, args.reference, args.model)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Benchmark Suite for The Polar Emotion Compass
+==============================================
+Reproducible performance measurements for `valence_engine.py` and the
+`app.py` wheel, with JSON output and baseline comparison.
+
+Measured:
+- Cold import time of `valence_engine` (fresh interpreter)
+- Model load time and anchor encoding time
+- Per-entry latency (p50 / p95 / p99) for short, long and many-sentence entries
+- Batch throughput (entries/s) via `calculate_polar_coordinates_batch`
+- Peak RSS of the benchmark process
+- `build_wheel_df` and wheel figure construction time, and the cached
+  wheel's per-rerun highlight update
+
+All journal text is synthetic and generated from a fixed seed, so two runs
+on the same machine score exactly the same entries.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmark.py --baseline benchmarks/baseline.json    # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from emotion_map import EMOTION_MAP
+from valence_engine import ENCODER_BACKENDS, MODEL_NAME, ValenceEngine
+
+SEED = 42
+LATENCY_ENTRIES = 50       # Entries per kind for per-entry latency
+THROUGHPUT_ENTRIES = 500   # Entries for batch throughput
+REPEATS = 3                # Repeats for cold-import / wheel timings
+REGRESSION_TOLERANCE = 0.20
+
+# Metrics where a higher value is better; every other metric is a duration or size
+HIGHER_IS_BETTER = {"batch_throughput_entries_per_s"}
+
+
+# ----------------------------------------------------------------------
+# Synthetic journal generator
+# ----------------------------------------------------------------------
+
+_SUBJECTS = ["I", "My teammate", "My sister", "Everyone at work", "My best friend", "The professor"]
+_EVENTS = [
+    "finished the project early", "forgot the meeting", "called me last night",
+    "said something unexpected", "moved away", "got the results back",
+    "cancelled our plans", "helped me with the assignment", "ignored my message",
+]
+_FILLER = [
+    "the weather was grey", "I had coffee by the window", "the bus was late again",
+    "there is so much to do this week", "I keep thinking about it", "nothing else happened",
+]
+_FEELINGS = [e.lower() for e in EMOTION_MAP if e != "Neutral"]
+
+ENTRY_KINDS = {
+    # kind: (min_sentences, max_sentences)
+    "short": (1, 1),
+    "long": (3, 6),
+    "many_sentence": (30, 60),
+}
+
+
+def _sentence(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.4:
+        return f"{rng.choice(_SUBJECTS)} {rng.choice(_EVENTS)}"
+    if roll < 0.75:
+        return f"I feel {rng.choice(_FEELINGS)} and a bit {rng.choice(_FEELINGS)}"
+    return rng.choice(_FILLER).capitalize()
+
+
+def generate_journal_entries(n: int, kind: str, seed: int = SEED) -> list[str]:
+    """
+    Deterministic synthetic journal entries.
+
+    Args:
+        n: Number of entries
+        kind: One of ENTRY_KINDS ("short", "long", "many_sentence")
+        seed: RNG seed
+
+    Returns:
+        List of `n` journal texts
+    """
+    low, high = ENTRY_KINDS[kind]
+    rng = random.Random(f"{seed}-{kind}")
+    entries = []
+    for _ in range(n):
+        sentences = [_sentence(rng) for _ in range(rng.randint(low, high))]
+        entries.append(". ".join(sentences) + rng.choice([".", "!", "?", ""]))
+    return entries
+
+
+# ----------------------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------------------
+
+def measure_cold_import(repeats: int = REPEATS) -> float:
+    """Median seconds to `import valence_engine` in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import valence_engine; print(time.perf_counter() - t)"
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return float(np.median(samples))
+
+
+def measure_model_load(model_name: str, backend: str) -> tuple[ValenceEngine, float, float]:
+    """
+    Time the model load and the anchor encoding separately.
+
+    Returns:
+        (loaded engine, model_load_s, anchor_encode_s)
+    """
+    engine = ValenceEngine(
+        model_name=model_name,
+        backend=backend,
+        cache_dir=None,            # Always measure a real anchor encode
+        embedding_cache_size=0,    # Latency numbers must not come from caches
+        result_cache_size=0,
+        persistent_cache=None,     # Ignore VALENCE_RESULT_CACHE
+    )
+    start = time.perf_counter()
+    engine.load()
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.model.encode(engine.emotion_anchors, convert_to_tensor=False)
+    anchor_s = time.perf_counter() - start
+    return engine, load_s - anchor_s, anchor_s
+
+
+def measure_latency(engine: ValenceEngine, texts: list[str]) -> dict:
+    """p50 / p95 / p99 milliseconds of single-entry scoring."""
+    engine.calculate_polar_coordinates(texts[0])  # Exclude first-call warm-up
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        engine.calculate_polar_coordinates(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+    }
+
+
+def measure_throughput(engine: ValenceEngine, texts: list[str]) -> float:
+    """Entries per second through the batch API."""
+    start = time.perf_counter()
+    engine.calculate_polar_coordinates_batch(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def measure_wheel(repeats: int = REPEATS) -> dict | None:
+    """Median milliseconds for `build_wheel_df`, figure construction and a cached-wheel rerun."""
+    try:
+        from wheel import build_wheel_df, build_wheel_figure, new_wheel_figure, set_highlight
+    except ImportError:
+        return None  # plotly / pandas not installed
+
+    build_wheel_figure(build_wheel_df("Neutral"))  # Warm plotly's lazy imports
+    cached = new_wheel_figure()
+    df_ms, fig_ms, rerun_ms = [], [], []
+    for i in range(repeats):
+        selected = list(EMOTION_MAP)[i % len(EMOTION_MAP)]
+        start = time.perf_counter()
+        df = build_wheel_df(selected)
+        df_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        build_wheel_figure(df)
+        fig_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        set_highlight(cached, selected)
+        rerun_ms.append((time.perf_counter() - start) * 1000)
+    return {
+        "build_wheel_df_ms": float(np.median(df_ms)),
+        "wheel_figure_ms": float(np.median(fig_ms)),
+        "wheel_rerun_ms": float(np.median(rerun_ms)),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmarks(
+    model_name: str = MODEL_NAME,
+    backend: str = "fp32",
+    seed: int = SEED,
+    latency_entries: int = LATENCY_ENTRIES,
+    throughput_entries: int = THROUGHPUT_ENTRIES,
+) -> dict:
+    """Run the full suite and return flat metrics plus run metadata."""
+    metrics = {"cold_import_s": measure_cold_import()}
+
+    engine, model_load_s, anchor_encode_s = measure_model_load(model_name, backend)
+    metrics["model_load_s"] = model_load_s
+    metrics["anchor_encode_s"] = anchor_encode_s
+
+    for kind in ENTRY_KINDS:
+        latency = measure_latency(engine, generate_journal_entries(latency_entries, kind, seed))
+        for name, value in latency.items():
+            metrics[f"latency_{kind}_{name}"] = value
+
+    mixed = []
+    for kind in ENTRY_KINDS:
+        mixed.extend(generate_journal_entries(throughput_entries // len(ENTRY_KINDS), kind, seed + 1))
+    metrics["batch_throughput_entries_per_s"] = measure_throughput(engine, mixed)
+
+    wheel = measure_wheel()
+    if wheel:
+        metrics.update(wheel)
+
+    metrics["peak_rss_mb"] = peak_rss_mb()
+
+    return {
+        "meta": {
+            "model": model_name,
+            "backend": backend,
+            "seed": seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "metrics": metrics,
+    }
+
+
+# ----------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------
+
+def compare_to_baseline(metrics: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[dict]:
+    """
+    Metrics that got worse than the baseline by more than `tolerance`.
+
+    Args:
+        metrics: Current `metrics` dict
+        baseline: Baseline `metrics` dict
+        tolerance: Allowed relative slowdown (0.20 = 20%)
+
+    Returns:
+        List of {"metric", "baseline", "current", "change"} for regressions
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = metrics.get(name)
+        if current is None or not base:
+            continue
+        change = (current - base) / base
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append({"metric": name, "baseline": base, "current": current, "change": change})
+    return regressions
+
+
+def print_results(results: dict, regressions: list[dict] | None = None) -> None:
+    print("=" * 80)
+    print("POLAR EMOTION COMPASS - BENCHMARK RESULTS")
+    print("=" * 80)
+    meta = results["meta"]
+    print(f"Model: {meta['model']} ({meta['backend']}) | Python {meta['python']} | CPUs: {meta['cpu_count']}")
+    print("-" * 80)
+    for name, value in results["metrics"].items():
+        print(f"{name:<40} {value:>14.4f}")
+    if regressions is not None:
+        print("-" * 80)
+        if not regressions:
+            print("No regressions against baseline.")
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']:.4f} -> {r['current']:.4f} ({r['change']:+.1%})")
+    print("=" * 80)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the valence engine and wheel hot paths.")
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--latency-entries", type=int, default=LATENCY_ENTRIES)
+    parser.add_argument("--throughput-entries", type=int, default=THROUGHPUT_ENTRIES)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against this stored results JSON")
+    parser.add_argument("--save-baseline", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.model, args.backend, args.seed, args.latency_entries, args.throughput_entries)
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results["metrics"], baseline["metrics"], args.tolerance)
+        results["regressions"] = regressions
+
+    print_results(results, regressions)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results saved to: {path}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Token-Budget Chunking for The Polar Emotion Compass
+====================================================
+Turns journal text into encoder-sized chunks using the model's own tokenizer.
+
+Key Features:
+- Starts from the engine's sentence split (`split_sentences`)
+- Merges very short fragments ("Ok.", "Hmm.") into a neighbouring chunk
+- Splits run-on sentences longer than the model's sequence limit at token
+  (preferably word) boundaries, so no tail text is silently truncated
+- Packs chunks into similar-length batches under a padded-token budget,
+  so each encoder forward pass wastes little compute on padding
+"""
+
+from typing import Callable
+
+import numpy as np
+
+MIN_CHUNK_TOKENS = 3        # Fragments with fewer content tokens get merged
+ENCODE_BATCH_TOKENS = 8192  # Max padded tokens per encoder forward pass
+
+
+class TokenChunker:
+    """
+    Sentence chunker aware of the encoder's token budget.
+
+    Token counts exclude the [CLS]/[SEP] special tokens, which the encoder
+    adds to every chunk; `max_tokens` is the content budget left after them.
+
+    Args:
+        tokenizer: The model's (fast) Hugging Face tokenizer
+        splitter: Sentence splitter producing the initial fragments
+        max_tokens: Maximum content tokens per chunk
+        min_tokens: Fragments shorter than this are merged (0 disables merging)
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        splitter: Callable[[str], list[str]],
+        max_tokens: int,
+        min_tokens: int = MIN_CHUNK_TOKENS,
+    ):
+        self.tokenizer = tokenizer
+        self.splitter = splitter
+        self.max_tokens = max(1, max_tokens)
+        self.min_tokens = min_tokens
+        # Offsets are needed to cut long sentences at token boundaries
+        self.can_split = bool(getattr(tokenizer, "is_fast", False))
+
+    def chunk(self, text: str) -> list[str]:
+        """Chunks for one journal text (empty list if there is nothing to score)."""
+        return self.chunk_many([text])[0]
+
+    def chunk_many(self, texts: list[str]) -> list[list[str]]:
+        """
+        Chunks for many texts, tokenizing all their fragments in one call.
+
+        Args:
+            texts: Journal texts
+
+        Returns:
+            One list of chunks per input text
+        """
+        return self.chunk_fragments([self.splitter(text) for text in texts])
+
+    def chunk_fragments(self, fragments: list[list[str]]) -> list[list[str]]:
+        """Same as `chunk_many`, for texts that have already been split into fragments."""
+        flat = [f for frags in fragments for f in frags]
+        if not flat:
+            return [[] for _ in fragments]
+
+        # verbose=False: over-long input is expected here, it is what gets split
+        kwargs = {"add_special_tokens": False, "truncation": False, "verbose": False}
+        if self.can_split:
+            kwargs["return_offsets_mapping"] = True
+        encoded = self.tokenizer(flat, **kwargs)
+        offsets = encoded["offset_mapping"] if self.can_split else [None] * len(flat)
+
+        results = []
+        pos = 0
+        for frags in fragments:
+            pieces = []
+            for fragment in frags:
+                n_tokens = len(encoded["input_ids"][pos])
+                if n_tokens > self.max_tokens and self.can_split:
+                    pieces.extend(self._split_long(fragment, offsets[pos]))
+                else:
+                    pieces.append((fragment, n_tokens))
+                pos += 1
+            results.append([text for text, _ in self._merge_short(pieces)])
+        return results
+
+    def _split_long(self, text: str, offsets: list[tuple[int, int]]) -> list[tuple[str, int]]:
+        """Cut an over-long sentence into <= max_tokens pieces, preferring word starts."""
+        pieces = []
+        start, n = 0, len(offsets)
+        while n - start > self.max_tokens:
+            cut = start + self.max_tokens
+            # Back off while the token at `cut` continues the previous word
+            while cut > start + 1 and offsets[cut][0] == offsets[cut - 1][1]:
+                cut -= 1
+            if cut == start + 1:
+                cut = start + self.max_tokens  # One huge "word": cut mid-word
+            pieces.append((text[offsets[start][0]:offsets[cut - 1][1]], cut - start))
+            start = cut
+        pieces.append((text[offsets[start][0]:offsets[n - 1][1]], n - start))
+        return pieces
+
+    def _merge_short(self, pieces: list[tuple[str, int]]) -> list[tuple[str, int]]:
+        """Join short fragments onto the previous chunk while the budget allows."""
+        merged = []
+        for text, n_tokens in pieces:
+            if merged and self.min_tokens:
+                prev_text, prev_tokens = merged[-1]
+                short = prev_tokens < self.min_tokens or n_tokens < self.min_tokens
+                # +1 for the "." that joins the two fragments
+                if short and prev_tokens + n_tokens + 1 <= self.max_tokens:
+                    merged[-1] = (f"{prev_text}. {text}", prev_tokens + n_tokens + 1)
+                    continue
+            merged.append((text, n_tokens))
+        return merged
+
+    def token_lengths(self, chunks: list[str]) -> np.ndarray:
+        """Encoder input length (with special tokens, capped at the limit) of each chunk."""
+        encoded = self.tokenizer(chunks, add_special_tokens=True, truncation=False, verbose=False)
+        lengths = np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(chunks))
+        return np.minimum(lengths, self.max_tokens + 2)
+
+
+def pack_batches(
+    lengths: np.ndarray,
+    batch_size: int,
+    max_batch_tokens: int = ENCODE_BATCH_TOKENS,
+) -> list[np.ndarray]:
+    """
+    Group chunk indices into padding-minimising encoder batches.
+
+    Chunks are sorted by token length and packed greedily; a batch closes when
+    it holds `batch_size` chunks or when padding everything to its longest
+    chunk would exceed `max_batch_tokens`.
+
+    Args:
+        lengths: Token length of each chunk
+        batch_size: Maximum chunks per batch
+        max_batch_tokens: Maximum padded tokens (rows x longest) per batch
+
+    Returns:
+        List of index arrays into `lengths`, one per batch
+    """
+    order = np.argsort(lengths, kind="stable")
+    batches = []
+    start = 0
+    for i in range(1, len(order) + 1):
+        if i == len(order):
+            batches.append(order[start:i])
+            break
+        # Sorted ascending, so the next chunk is the longest if added
+        rows = i + 1 - start
+        if rows > batch_size or rows * lengths[order[i]] > max_batch_tokens:
+            batches.append(order[start:i])
+            start = i
+    return batches
@@ -0,0 +1,66 @@
+"""
+Labelled Corpus for The Polar Emotion Compass
+==============================================
+The 10 hand-labelled journal entries used by `test.py` and, by default,
+by the offline tools (`backend_drift.py`, `lexicon.py`,
+`threshold_tuning.py`).
+
+Each case has:
+- name: Short scenario title
+- text: Journal entry
+- expected: Expected emotion(s) in words (`threshold_tuning.expected_labels`
+  extracts the labels)
+"""
+
+TEST_CASES = [
+    {
+        "name": "Stolen Web App Code",
+        "text": "My teammate took credit for the web app code I wrote. I feel betrayed and furious about this situation.",
+        "expected": "Furious / Infuriated"
+    },
+    {
+        "name": "Dream School Acceptance",
+        "text": "I just got accepted into my dream college! I'm so excited and proud of myself!",
+        "expected": "Excited / Euphoric"
+    },
+    {
+        "name": "Overwhelming Final Exams",
+        "text": "Final exams are next week and I haven't studied enough. I'm anxious and overwhelmed by everything.",
+        "expected": "Overwhelmed / Anxious"
+    },
+    {
+        "name": "Peaceful Weekend Morning",
+        "text": "Woke up on Saturday with no deadlines. Just relaxing with coffee and music. I feel peaceful and content.",
+        "expected": "Peaceful / Content"
+    },
+    {
+        "name": "Loss of a Loved One",
+        "text": "I lost my grandfather yesterday and the house feels so empty. I miss him so much, I feel incredibly sad and lonely.",
+        "expected": "Grief / Sad"
+    },
+    {
+        "name": "Forgot Best Friend's Birthday",
+        "text": "I completely forgot my best friend's birthday. I feel like a terrible person, so guilty and ashamed.",
+        "expected": "Guilty / Ashamed"
+    },
+    {
+        "name": "Imposter Syndrome",
+        "text": "Everyone in my class seems so much smarter than me. I feel inadequate and insecure about my abilities.",
+        "expected": "Inadequate / Insecure"
+    },
+    {
+        "name": "Unexpected Kindness",
+        "text": "My neighbor helped me fix my flat tire in the rain without me even asking. I'm so grateful and touched by their kindness.",
+        "expected": "Grateful"
+    },
+    {
+        "name": "Mixed Emotions - Close Angles (Should Blend)",
+        "text": "I'm excited about the new job but also nervous about meeting expectations.",
+        "expected": "Excited (blended with Nervous if close enough)"
+    },
+    {
+        "name": "Conflicting Emotions - Far Angles (Should NOT Blend)",
+        "text": "I'm happy I graduated but sad to leave my friends behind forever.",
+        "expected": "Happy (snapped, NOT blended with Sad)"
+    }
+]
@@ -0,0 +1,172 @@
+"""
+Engine Replicas & Warm-up for The Polar Emotion Compass
+========================================================
+Starts one or more warmed-up `ValenceEngine` replicas in the background and
+reports when they are ready, so the first patient entry is as fast as the
+hundredth.
+
+Key Features:
+- `configure_torch_threads()`: torch intra-op / inter-op thread counts
+  (defaults from VALENCE_INTRA_OP_THREADS / VALENCE_INTER_OP_THREADS)
+- `EnginePool`: N replicas per host (VALENCE_REPLICAS), sharing one copy of
+  the anchor embeddings, each warmed up with `ValenceEngine.warm_up()`
+- Readiness flag (`is_ready` / `wait_ready()`) for the app and the scoring server
+- `acquire()` lends an idle replica to one caller at a time; torch releases
+  the GIL during forward passes, so replicas encode in parallel
+
+Thread counts are process-wide, so they are only changed when given
+(argument or environment variable); otherwise torch keeps its own. With
+several replicas, keep replicas x intra-op threads within the cores
+available, e.g. threads_per_replica = cores // replicas.
+
+Usage:
+    pool = EnginePool(replicas=2).start()   # loads + warms up in the background
+    pool.wait_ready()
+    with pool.acquire() as engine:
+        radius, angle, emotion = engine.calculate_polar_coordinates(text)
+"""
+
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+from valence_engine import WARMUP_SHAPES, ValenceEngine
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+DEFAULT_REPLICAS = _env_int("VALENCE_REPLICAS") or 1
+DEFAULT_INTRA_OP_THREADS = _env_int("VALENCE_INTRA_OP_THREADS")  # None: torch default
+DEFAULT_INTER_OP_THREADS = _env_int("VALENCE_INTER_OP_THREADS")  # None: torch default
+
+
+def configure_torch_threads(intra_op: int | None = None, inter_op: int | None = None) -> tuple[int, int]:
+    """
+    Set torch thread pool sizes (None leaves a setting unchanged).
+
+    Inter-op threads can only be set before torch runs any parallel work;
+    a late call is reported and ignored.
+
+    Returns:
+        (intra_op, inter_op) thread counts now in effect
+    """
+    if intra_op and "torch" not in sys.modules:
+        # Picked up by OpenMP / MKL when torch is first imported
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(var, str(intra_op))
+    import torch
+
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            print(f"Could not set inter-op threads: {e}")
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+class EnginePool:
+    """
+    Warmed-up engine replicas with a readiness flag.
+
+    Args:
+        replicas: Engines to run (ignored if `engines` is given)
+        threads_per_replica: torch intra-op threads (default: torch's own)
+        inter_op_threads: torch inter-op threads (default: torch's own)
+        warmup_shapes: Batch shapes passed to `ValenceEngine.warm_up()` (() skips warm-up)
+        engines: Existing engines to wrap instead of building new ones
+        **engine_kwargs: Passed to every `ValenceEngine`
+    """
+
+    def __init__(
+        self,
+        replicas: int | None = None,
+        threads_per_replica: int | None = DEFAULT_INTRA_OP_THREADS,
+        inter_op_threads: int | None = DEFAULT_INTER_OP_THREADS,
+        warmup_shapes=WARMUP_SHAPES,
+        engines: list[ValenceEngine] | None = None,
+        **engine_kwargs,
+    ):
+        if engines is None:
+            engines = [ValenceEngine(**engine_kwargs) for _ in range(replicas or DEFAULT_REPLICAS)]
+        self.engines = list(engines)
+        self.threads_per_replica = threads_per_replica
+        self.inter_op_threads = inter_op_threads
+        self.warmup_shapes = warmup_shapes
+        self.error = None  # Exception raised during start-up, if any
+
+        self._idle = queue.Queue()
+        for engine in self.engines:
+            self._idle.put(engine)
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def replicas(self) -> int:
+        return len(self.engines)
+
+    @property
+    def is_ready(self) -> bool:
+        """True once every replica is loaded and warmed up."""
+        return self._done.is_set() and self.error is None
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until start-up finishes (or fails, or `timeout` passes). Returns `is_ready`."""
+        self._done.wait(timeout)
+        return self.is_ready
+
+    def start(self, background: bool = True) -> "EnginePool":
+        """Load and warm up every replica (in a background thread by default)."""
+        if self._thread is None and not self._done.is_set():
+            if background:
+                self._thread = threading.Thread(target=self._start, name="engine-warmup", daemon=True)
+                self._thread.start()
+            else:
+                self._start()
+        return self
+
+    def _start(self) -> None:
+        try:
+            if self.threads_per_replica or self.inter_op_threads:
+                # Process-wide: leave torch's settings alone unless asked
+                configure_torch_threads(self.threads_per_replica, self.inter_op_threads)
+            first = self.engines[0].load()
+            for engine in self.engines[1:]:
+                # One copy of the anchors for all replicas
+                engine.load(
+                    anchor_embeddings=first.anchor_embeddings,
+                    anchor_unit_embeddings=first.anchor_unit_embeddings,
+                )
+            if self.warmup_shapes:
+                for engine in self.engines:
+                    engine.warm_up(self.warmup_shapes)
+            print(f"{self.replicas} engine replica(s) ready ({self.threads_per_replica or 'default'} threads each).")
+        except Exception as e:
+            self.error = e
+            print(f"Engine start-up failed: {e}")
+        finally:
+            self._done.set()
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None):
+        """Borrow an idle replica for the duration of a `with` block."""
+        engine = self._idle.get(timeout=timeout)
+        try:
+            yield engine
+        finally:
+            self._idle.put(engine)
+
+    def fast_path_stats(self) -> dict:
+        """`ValenceEngine.fast_path_stats()` summed over replicas."""
+        stats = [engine.fast_path_stats() for engine in self.engines]
+        totals = {key: sum(s[key] for s in stats) for key in ("entries", "fast_path", "verified", "disagreements")}
+        totals["enabled"] = stats[0]["enabled"]
+        totals["fast_path_share"] = totals["fast_path"] / totals["entries"] if totals["entries"] else 0.0
+        totals["disagreement_rate"] = totals["disagreements"] / totals["verified"] if totals["verified"] else 0.0
+        return totals
@@ -0,0 +1,220 @@
+"""
+Local Journal Store for The Polar Emotion Compass
+==================================================
+Append-only SQLite store for logged entries, so patients and therapists
+can look back over months of history instead of one-row CSV downloads.
+
+Key Features:
+- One row per entry: patient, timestamp, context, journal text, polar result
+- Sentence embeddings kept as compact float16 blobs in a separate table,
+  so history queries never read them
+- Indexed by patient, timestamp, theme, location and emotion
+- Range queries return NumPy columns (no per-row Python objects), ready to
+  plot on the wheel
+- WAL journal mode: the app can read while another process appends
+- Local file only (VALENCE_JOURNAL_DB overrides the path); nothing is sent anywhere
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "VALENCE_JOURNAL_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal.sqlite"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id          INTEGER PRIMARY KEY,
+    patient     TEXT NOT NULL,
+    ts          REAL NOT NULL,          -- Unix seconds
+    time_of_day TEXT,
+    theme       TEXT,
+    location    TEXT,
+    journal     TEXT NOT NULL,
+    radius      REAL NOT NULL,
+    angle       REAL NOT NULL,
+    emotion     TEXT NOT NULL,
+    energy      TEXT,
+    model       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_patient_ts  ON entries (patient, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_ts          ON entries (ts);
+CREATE INDEX IF NOT EXISTS idx_entries_theme_ts    ON entries (theme, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_location_ts ON entries (location, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_emotion_ts  ON entries (emotion, ts);
+
+CREATE TABLE IF NOT EXISTS sentence_embeddings (
+    entry_id    INTEGER PRIMARY KEY REFERENCES entries (id),
+    n_sentences INTEGER NOT NULL,
+    dim         INTEGER NOT NULL,
+    data        BLOB NOT NULL           -- float16, row-major (n_sentences, dim)
+);
+"""
+
+# Columns returned by `query`, with their NumPy dtypes
+HISTORY_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("ts", np.float64),
+    ("radius", np.float32),
+    ("angle", np.float32),
+    ("emotion", "U24"),
+])
+
+
+def _timestamp(value: datetime | float | None) -> float | None:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class JournalStore:
+    """
+    Append-only journal database.
+
+    Args:
+        path: SQLite file (created with its schema if missing); ":memory:" for tests
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared across Streamlit's script threads, guarded by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(
+        self,
+        patient: str,
+        journal: str,
+        radius: float,
+        angle: float,
+        emotion: str,
+        timestamp: datetime | float | None = None,
+        time_of_day: str | None = None,
+        theme: str | None = None,
+        location: str | None = None,
+        energy: str | None = None,
+        model: str | None = None,
+        sentence_embeddings: np.ndarray | None = None,
+    ) -> int:
+        """
+        Store one logged entry (and optionally its sentence embeddings).
+
+        Args:
+            patient: Patient identifier
+            journal: Entry text
+            radius, angle, emotion: The engine's result
+            timestamp: When the entry was written (default: now)
+            time_of_day, theme, location, energy: Context shown in the app
+            model: Model that produced the result
+            sentence_embeddings: (n_sentences, dim) array, stored as float16
+
+        Returns:
+            The new entry id
+        """
+        ts = _timestamp(timestamp)
+        if ts is None:
+            ts = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (patient, ts, time_of_day, theme, location, journal,"
+                " radius, angle, emotion, energy, model) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (patient, ts, time_of_day, theme, location, journal,
+                 float(radius), float(angle), emotion, energy, model),
+            )
+            entry_id = cursor.lastrowid
+            if sentence_embeddings is not None and len(sentence_embeddings):
+                emb = np.ascontiguousarray(sentence_embeddings, dtype=np.float16)
+                self._conn.execute(
+                    "INSERT INTO sentence_embeddings (entry_id, n_sentences, dim, data) VALUES (?, ?, ?, ?)",
+                    (entry_id, emb.shape[0], emb.shape[1], emb.tobytes()),
+                )
+        return entry_id
+
+    def query(
+        self,
+        patient: str | None = None,
+        start: datetime | float | None = None,
+        end: datetime | float | None = None,
+        theme: str | None = None,
+        location: str | None = None,
+        emotion: str | None = None,
+    ) -> np.ndarray:
+        """
+        Entries matching every given filter, oldest first.
+
+        Args:
+            patient: Patient identifier
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (exclusive)
+            theme, location, emotion: Exact-match filters
+
+        Returns:
+            Structured array with HISTORY_DTYPE fields (id, ts, radius, angle, emotion)
+        """
+        clauses, params = [], []
+        for column, value in (("patient", patient), ("theme", theme), ("location", location), ("emotion", emotion)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_timestamp(end))
+
+        sql = "SELECT id, ts, radius, angle, emotion FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts"
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            # Rows stream straight into the structured array
+            return np.fromiter(cursor, dtype=HISTORY_DTYPE)
+
+    def entries(self, ids: list[int] | np.ndarray) -> list[dict]:
+        """Full rows (including journal text and context) for the given ids."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM entries WHERE id IN ({placeholders}) ORDER BY ts", ids)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor]
+
+    def sentence_embeddings(self, entry_id: int) -> np.ndarray | None:
+        """Stored float16 sentence embeddings of one entry, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT n_sentences, dim, data FROM sentence_embeddings WHERE entry_id = ?", (int(entry_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        n, dim, data = row
+        return np.frombuffer(data, dtype=np.float16).reshape(n, dim)
+
+    def patients(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT patient FROM entries ORDER BY patient")]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,203 @@
+"""
+Lexical Fast Path for The Polar Emotion Compass
+================================================
+Recognises entries that name their emotion outright ("I feel so guilty")
+and answers from `EMOTION_MAP` without a transformer forward pass.
+
+Key Features:
+- One precompiled regex over EMOTION_MAP labels plus configurable synonyms
+- Negation handling: a sentence with any negator ("not happy", "don't feel
+  lonely", "happy until I wasn't") is never fast-pathed; curly apostrophes
+  count the same as straight ones
+- Intensity modifiers scale the map radius ("extremely" up, "a bit" down)
+- Only unambiguous matches qualify: a single distinct emotion, no negation,
+  and a short entry; everything else falls through to the embedding path
+
+Usage:
+    python lexicon.py --corpus exports.csv   # fast-path share + disagreement with the model
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from emotion_map import EMOTION_MAP
+
+# Extra words that unambiguously name an EMOTION_MAP emotion
+DEFAULT_SYNONYMS = {
+    "glad": "Happy", "joyful": "Happy", "cheerful": "Happy",
+    "thankful": "Grateful", "thrilled": "Excited", "hopeful": "Optimistic",
+    "angry": "Mad", "annoyed": "Irritated", "enraged": "Infuriated", "envious": "Jealous",
+    "afraid": "Scared", "frightened": "Scared", "worried": "Anxious", "stressed": "Overwhelmed",
+    "panicked": "Terrified", "powerless": "Helpless", "worthless": "Inadequate",
+    "unhappy": "Sad", "heartbroken": "Hurt", "grieving": "Grief", "let down": "Disappointed",
+    "hopeless": "Despair", "exhausted": "Tired", "drained": "Tired", "indifferent": "Apathetic",
+    "embarrassed": "Ashamed", "calm": "Peaceful", "amazed": "Awestruck", "shocked": "Surprised",
+}
+
+# Labels too ambiguous as plain words ("bad weather", "the content", "hurt my leg")
+EXCLUDED_TERMS = frozenset({"bad", "content", "hurt", "neutral"})
+
+# Radius multipliers for the words right before an emotion word
+INTENSITY_MODIFIERS = {
+    "extremely": 1.4, "incredibly": 1.4, "completely": 1.4, "totally": 1.3,
+    "very": 1.2, "so": 1.2, "really": 1.2, "deeply": 1.2,
+    "somewhat": 0.8, "kind of": 0.8, "a bit": 0.7, "a little": 0.7, "slightly": 0.7,
+}
+
+NEGATORS = frozenset({
+    "not", "no", "never", "without", "hardly", "barely", "nor", "neither", "nothing",
+    "dont", "cant", "wont", "isnt", "didnt", "doesnt", "wasnt", "arent", "cannot",
+})
+FAST_PATH_MAX_SENTENCES = 3  # Longer entries always use the model
+
+_WORD = re.compile(r"[a-z']+")
+_APOSTROPHES = str.maketrans({"\u2019": "'", "\u2018": "'", "\u02bc": "'"})  # Phone keyboards type "don’t"
+
+
+class LexicalMatcher:
+    """
+    Precompiled matcher for explicit emotion words.
+
+    Args:
+        emotion_map: Emotion -> {radius, angle, ...} mapping (labels become terms)
+        synonyms: Extra term -> emotion label entries
+        modifiers: Intensity word/phrase -> radius multiplier ({} disables scaling)
+        excluded: Lowercase terms never matched
+        max_sentences: Entries with more sentences are left to the model
+    """
+
+    def __init__(
+        self,
+        emotion_map: dict = EMOTION_MAP,
+        synonyms: dict | None = None,
+        modifiers: dict | None = None,
+        excluded: frozenset = EXCLUDED_TERMS,
+        max_sentences: int = FAST_PATH_MAX_SENTENCES,
+    ):
+        self.emotion_map = emotion_map
+        self.modifiers = INTENSITY_MODIFIERS if modifiers is None else modifiers
+        self.max_sentences = max_sentences
+
+        terms = {label.lower(): label for label in emotion_map if label != "Neutral"}
+        for term, label in (DEFAULT_SYNONYMS if synonyms is None else synonyms).items():
+            if label in emotion_map:
+                terms[term.lower()] = label
+        self.terms = {t: label for t, label in terms.items() if t not in excluded}
+
+        # Longest terms first so "let down" wins over a shorter overlapping term
+        alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b({alternation})\b")
+
+    @staticmethod
+    def _is_negated(words: list[str]) -> bool:
+        # Anywhere in the sentence: "not happy" and "happy until I wasn't" both go to the model
+        return any(word in NEGATORS or word.endswith("n't") for word in words)
+
+    def _modifier(self, preceding: list[str]) -> float:
+        if len(preceding) >= 2:
+            factor = self.modifiers.get(" ".join(preceding[-2:]))
+            if factor is not None:
+                return factor
+        return self.modifiers.get(preceding[-1], 1.0) if preceding else 1.0
+
+    def match(self, sentences: list[str]) -> tuple[float, float, str] | None:
+        """
+        Fast-path result for an entry, or None if the model should decide.
+
+        Args:
+            sentences: The entry's sentences (`split_sentences` output)
+
+        Returns:
+            (radius, angle_degrees, emotion) for an unambiguous match, else None
+        """
+        if not sentences or len(sentences) > self.max_sentences:
+            return None
+
+        label = None
+        factor = 1.0
+        for sentence in sentences:
+            lowered = sentence.lower().translate(_APOSTROPHES)
+            for m in self._pattern.finditer(lowered):
+                if self._is_negated(_WORD.findall(lowered)):
+                    return None
+                preceding = _WORD.findall(lowered[:m.start()])
+                term_label = self.terms[m.group(1)]
+                if label is None:
+                    label, factor = term_label, self._modifier(preceding)
+                elif term_label != label:
+                    return None  # Several emotions: let the model blend them
+
+        if label is None:
+            return None
+        data = self.emotion_map[label]
+        return float(min(1.0, data["radius"] * factor)), float(data["angle"]), label
+
+
+# ----------------------------------------------------------------------
+# Offline report: fast-path share and disagreement with the model
+# ----------------------------------------------------------------------
+
+def fast_path_report(texts: list[str], model_name: str | None = None) -> dict:
+    """
+    Score a corpus both ways and compare.
+
+    Args:
+        texts: Journal texts
+        model_name: sentence-transformers model name or path (engine default if None)
+
+    Returns:
+        JSON-serialisable report dictionary
+    """
+    from valence_engine import ValenceEngine, split_sentences
+
+    matcher = LexicalMatcher()
+    kwargs = {"model_name": model_name} if model_name else {}
+    engine = ValenceEngine(result_cache_size=0, persistent_cache=None, **kwargs)
+    _, _, labels = engine.calculate_polar_coordinates_batch(texts)
+
+    hits, disagreements = 0, []
+    for i, text in enumerate(texts):
+        result = matcher.match(split_sentences(text))
+        if result is None:
+            continue
+        hits += 1
+        if result[2] != labels[i]:
+            disagreements.append({"index": i, "fast_path": result[2], "model": str(labels[i])})
+
+    n = len(texts)
+    return {
+        "entries": n,
+        "fast_path": hits,
+        "fast_path_share": hits / n if n else 0.0,
+        "disagreements": len(disagreements),
+        "disagreement_rate": len(disagreements) / hits if hits else 0.0,
+        "examples": disagreements[:10],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    from backend_drift import load_corpus
+
+    parser = argparse.ArgumentParser(description="Measure how often the lexical fast path applies and agrees.")
+    parser.add_argument("--corpus", help="CSV (Journal column) or text file, one entry per line (default: corpus.py test cases)")
+    parser.add_argument("--model", help="sentence-transformers model name or path")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = fast_path_report(load_corpus(args.corpus), args.model)
+    print(f"Entries:         {report['entries']}")
+    print(f"Fast path:       {report['fast_path']} ({report['fast_path_share']:.1%})")
+    print(f"Disagreements:   {report['disagreements']} ({report['disagreement_rate']:.1%} of fast-path entries)")
+    for example in report["examples"]:
+        print(f"  entry {example['index']}: fast path {example['fast_path']} vs model {example['model']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Process-Pool Scoring for The Polar Emotion Compass
+===================================================
+Spreads bulk scoring across CPU cores with one `ValenceEngine` per worker.
+
+Key Features:
+- Configurable worker count with torch intra-op threads tuned per worker
+  (workers x threads_per_worker <= cores, so workers do not oversubscribe)
+- Anchor matrices live in one `multiprocessing.shared_memory` block that
+  every worker maps instead of copying
+- Entries are distributed as chunks; results come back in input order
+
+Usage:
+    with ParallelScorer(workers=8) as scorer:
+        radii, angles, labels = scorer.calculate_polar_coordinates_batch(texts)
+"""
+
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from typing import Iterable
+
+import numpy as np
+
+from valence_engine import ENCODE_BATCH_SIZE, ValenceEngine
+
+ENTRIES_PER_TASK = 64  # Journal entries sent to a worker per task
+
+
+def default_workers() -> int:
+    """One worker per core available to this process."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+
+_WORKER_ENGINE = None
+_WORKER_SHM = None  # Keeps the shared block mapped for the worker's lifetime
+
+
+def _init_worker(engine_kwargs: dict, shm_name: str, shape: tuple, dtype: str, threads: int) -> None:
+    """Pin thread counts, map the shared anchors and load the worker's model."""
+    global _WORKER_ENGINE, _WORKER_SHM
+
+    # Must be set before torch spins up its thread pools
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+
+    _WORKER_SHM = shared_memory.SharedMemory(name=shm_name)
+    anchors = np.ndarray(shape, dtype=dtype, buffer=_WORKER_SHM.buf)
+    anchors.flags.writeable = False
+
+    _WORKER_ENGINE = ValenceEngine(**engine_kwargs)
+    _WORKER_ENGINE.load(anchor_embeddings=anchors[0], anchor_unit_embeddings=anchors[1])
+
+
+def _score_chunk(args: tuple[list[str], int | None]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    texts, batch_size = args
+    return _WORKER_ENGINE.calculate_polar_coordinates_batch(texts, batch_size)
+
+
+# ----------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------
+
+class ParallelScorer:
+    """
+    Pool of scoring processes exposing the engine's batch API.
+
+    The parent loads one engine to obtain the anchors, copies raw and
+    unit-normalised anchors into a shared-memory block, then starts
+    `workers` processes that each load the model and map that block.
+
+    Args:
+        workers: Number of worker processes (default: one per core)
+        threads_per_worker: torch intra-op threads per worker
+            (default: cores // workers, at least 1)
+        entries_per_task: Journal entries per task sent to a worker
+        start_method: multiprocessing start method ("spawn" is safe with torch)
+        **engine_kwargs: Passed to every worker's `ValenceEngine`
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        threads_per_worker: int | None = None,
+        entries_per_task: int = ENTRIES_PER_TASK,
+        start_method: str = "spawn",
+        **engine_kwargs,
+    ):
+        self.workers = workers or default_workers()
+        self.threads_per_worker = threads_per_worker or max(1, default_workers() // self.workers)
+        self.entries_per_task = entries_per_task
+        self.start_method = start_method
+        self.engine_kwargs = engine_kwargs
+        self._pool = None
+        self._shm = None
+        self._fingerprint = None
+
+    @property
+    def result_fingerprint(self) -> str:
+        """Fingerprint of the workers' engine configuration (see `ValenceEngine.result_fingerprint`)."""
+        if self._fingerprint is None:
+            self._fingerprint = ValenceEngine(**self.engine_kwargs).result_fingerprint
+        return self._fingerprint
+
+    def start(self) -> "ParallelScorer":
+        """Publish anchors to shared memory and start the worker pool."""
+        if self._pool is not None:
+            return self
+
+        engine = ValenceEngine(**self.engine_kwargs).load()
+        anchors = np.stack([
+            np.asarray(engine.anchor_embeddings, dtype=np.float32),
+            np.asarray(engine.anchor_unit_embeddings, dtype=np.float32),
+        ])
+        self._shm = shared_memory.SharedMemory(create=True, size=anchors.nbytes)
+        np.ndarray(anchors.shape, dtype=anchors.dtype, buffer=self._shm.buf)[:] = anchors
+        del engine  # The parent does not score; free its model
+
+        ctx = mp.get_context(self.start_method)
+        self._pool = ctx.Pool(
+            processes=self.workers,
+            initializer=_init_worker,
+            initargs=(self.engine_kwargs, self._shm.name, anchors.shape, anchors.dtype.str, self.threads_per_worker),
+        )
+        print(f"Started {self.workers} scoring workers x {self.threads_per_worker} threads.")
+        return self
+
+    def close(self) -> None:
+        """Stop the workers and release the shared anchor block."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "ParallelScorer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def calculate_polar_coordinates_batch(
+        self,
+        texts: Iterable[str],
+        batch_size: int | None = ENCODE_BATCH_SIZE,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score entries across the pool. Same contract as
+        `ValenceEngine.calculate_polar_coordinates_batch`.
+
+        Args:
+            texts: List or iterable of journal entry texts
+            batch_size: Sentences per encoder forward pass inside each worker
+
+        Returns:
+            Tuple of (radii, angles_degrees, labels) arrays in input order
+        """
+        self.start()
+        texts = list(texts)
+        tasks = [
+            (texts[i:i + self.entries_per_task], batch_size)
+            for i in range(0, len(texts), self.entries_per_task)
+        ]
+        if not tasks:
+            return np.zeros(0), np.zeros(0), np.zeros(0, dtype=object)
+
+        # imap preserves task order, so results line up with the input
+        parts = list(self._pool.imap(_score_chunk, tasks))
+        return tuple(np.concatenate([part[i] for part in parts]) for i in range(3))
@@ -0,0 +1,155 @@
+"""
+Hot-Path Profiling for The Polar Emotion Compass
+=================================================
+Optional per-stage timing for `ValenceEngine` scoring calls.
+
+Each scoring call records how long it spent in each stage
+(split -> encode -> similarity -> blend), plus sentence and token counts,
+into rolling histograms of the most recent calls.
+
+When disabled (the default), `EngineProfiler.start_call()` hands back a
+shared no-op timer, so the hot path pays a few empty method calls and no
+`perf_counter()` reads.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PROFILE_WINDOW = 1024  # Most recent calls kept per metric
+# Histogram bucket upper bounds (milliseconds for stages, raw counts otherwise)
+BUCKET_EDGES = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+class RollingHistogram:
+    """
+    Fixed-size window of recent samples with summary statistics.
+
+    Args:
+        window: Number of most recent samples kept
+    """
+
+    def __init__(self, window: int = PROFILE_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.total_count = 0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.total_count += 1
+
+    def summary(self) -> dict:
+        """Count, mean, percentiles, max and bucket counts over the window."""
+        if not self._samples:
+            return {"count": 0, "total_count": self.total_count}
+        values = np.fromiter(self._samples, dtype=np.float64)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        buckets = [0] * (len(BUCKET_EDGES) + 1)
+        for v in values:
+            buckets[bisect.bisect_left(BUCKET_EDGES, v)] += 1
+        return {
+            "count": int(values.size),
+            "total_count": self.total_count,
+            "mean": float(values.mean()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(values.max()),
+            "buckets": dict(zip([f"<={e}" for e in BUCKET_EDGES] + ["inf"], buckets)),
+        }
+
+
+class _NullCallTimer:
+    """Timer handed out while profiling is disabled: every method is a no-op."""
+
+    enabled = False
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def finish(self, **counts) -> None:
+        pass
+
+
+_NULL_TIMER = _NullCallTimer()
+
+
+class _CallTimer:
+    """Times consecutive stages of one scoring call."""
+
+    enabled = True
+
+    def __init__(self, profiler: "EngineProfiler", kind: str):
+        self._profiler = profiler
+        self._kind = kind
+        self._start = self._last = time.perf_counter()
+        self._stages = {}
+
+    def mark(self, stage: str) -> None:
+        """Close the current stage, attributing the time since the last mark to `stage`."""
+        now = time.perf_counter()
+        self._stages[stage] = (now - self._last) * 1000
+        self._last = now
+
+    def finish(self, **counts) -> None:
+        """Record the call: stage timings, total time and counts (sentences, tokens, ...)."""
+        self._stages["total"] = (time.perf_counter() - self._start) * 1000
+        self._profiler._record(self._kind, self._stages, counts)
+
+
+class EngineProfiler:
+    """
+    Collects per-stage timings for scoring calls.
+
+    Args:
+        enabled: Start collecting immediately (default from VALENCE_PROFILE=1)
+        window: Number of most recent calls kept per metric
+    """
+
+    def __init__(self, enabled: bool | None = None, window: int = PROFILE_WINDOW):
+        if enabled is None:
+            enabled = os.environ.get("VALENCE_PROFILE", "") == "1"
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._calls = {}
+
+    def start_call(self, kind: str = "single"):
+        """Timer for one scoring call (a shared no-op when disabled)."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _CallTimer(self, kind)
+
+    def _record(self, kind: str, stages: dict, counts: dict) -> None:
+        with self._lock:
+            self._calls[kind] = self._calls.get(kind, 0) + 1
+            for name, value in list(stages.items()) + list(counts.items()):
+                key = f"{kind}.{name}"
+                if key not in self._histograms:
+                    self._histograms[key] = RollingHistogram(self.window)
+                self._histograms[key].add(value)
+
+    def stats(self) -> dict:
+        """
+        Snapshot of everything recorded so far.
+
+        Returns:
+            {"enabled", "calls": {kind: n}, "metrics": {"<kind>.<name>": summary}}
+            Stage metrics are in milliseconds; count metrics are raw counts.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "calls": dict(self._calls),
+                "metrics": {key: h.summary() for key, h in sorted(self._histograms.items())},
+            }
+
+    def reset(self) -> None:
+        """Forget all recorded calls."""
+        with self._lock:
+            self._histograms.clear()
+            self._calls.clear()
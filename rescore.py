@@ -0,0 +1,258 @@
+"""
+Bulk Re-Scoring CLI for The Polar Emotion Compass
+==================================================
+Streams exported journal CSVs through the valence engine in chunks.
+
+Input rows are the `app.py` export format (Exact_Time, Time_of_Day, Theme,
+Location, Journal, Radius, Angle, Emotion, Energy). Every other column is
+passed through unchanged; Radius / Angle / Emotion / Energy are recomputed
+from `Journal`.
+
+Key Features:
+- Constant memory: rows are read, scored and written one chunk at a time
+- Batched scoring via `ValenceEngine.calculate_polar_coordinates_batch`
+- Checkpointing: an interrupted run resumes from the last written chunk
+  (only with the same input file and engine configuration)
+- Optional multi-core scoring (`--workers`) via `parallel_scoring.ParallelScorer`
+- Optional persistent result cache (`--result-cache`): unchanged entries in
+  later runs are looked up instead of re-encoded
+
+Usage:
+    python rescore.py exports/*.csv --output-dir rescored/
+    python rescore.py big.csv --chunk-size 2048 --no-resume
+    python rescore.py big.csv --workers 16 --chunk-size 4096
+    python rescore.py exports/*.csv --result-cache results.sqlite
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Iterator
+
+from emotion_map import EMOTION_MAP
+from parallel_scoring import ParallelScorer
+from valence_engine import DEFAULT_RESULT_CACHE, ENCODE_BATCH_SIZE, ENCODER_BACKENDS, MODEL_NAME, ValenceEngine
+
+CHUNK_SIZE = 512  # Rows scored per engine batch call
+SCORED_COLUMNS = ["Radius", "Angle", "Emotion", "Energy"]
+
+
+def output_path_for(input_path: str, output_dir: str | None) -> str:
+    """Where the re-scored copy of `input_path` is written."""
+    if output_dir:
+        return os.path.join(output_dir, os.path.basename(input_path))
+    stem, ext = os.path.splitext(input_path)
+    return f"{stem}_rescored{ext or '.csv'}"
+
+
+def iter_chunks(reader: csv.DictReader, chunk_size: int) -> Iterator[list[dict]]:
+    """Yield lists of at most `chunk_size` rows."""
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# Checkpoints
+# ----------------------------------------------------------------------
+
+def _checkpoint_path(output_path: str) -> str:
+    return output_path + ".ckpt"
+
+
+def _input_fingerprint(input_path: str) -> dict:
+    """Identify an input file so a checkpoint is never applied to a different one."""
+    st = os.stat(input_path)
+    return {"input": os.path.abspath(input_path), "size": st.st_size, "mtime": st.st_mtime}
+
+
+def load_checkpoint(input_path: str, output_path: str, engine_fingerprint: str | None = None) -> dict | None:
+    """Return the saved progress for this input/output pair, if still valid."""
+    try:
+        with open(_checkpoint_path(output_path), "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("fingerprint") != _input_fingerprint(input_path):
+        return None
+    if checkpoint.get("engine") != engine_fingerprint:
+        # Model, backend, thresholds or exemplar bank changed: never mix old and new scores
+        print(f"{input_path}: checkpoint was written with a different engine configuration; starting over")
+        return None
+    if not os.path.exists(output_path) or os.path.getsize(output_path) < checkpoint["output_offset"]:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(
+    input_path: str,
+    output_path: str,
+    rows_done: int,
+    output_offset: int,
+    engine_fingerprint: str | None = None,
+) -> None:
+    """Atomically record how many rows (and output bytes) are complete."""
+    checkpoint = {
+        "fingerprint": _input_fingerprint(input_path),
+        "engine": engine_fingerprint,
+        "rows_done": rows_done,
+        "output_offset": output_offset,
+    }
+    path = _checkpoint_path(output_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+# ----------------------------------------------------------------------
+# Re-scoring
+# ----------------------------------------------------------------------
+
+def rescore_rows(engine: ValenceEngine | ParallelScorer, rows: list[dict], batch_size: int) -> None:
+    """Recompute the scored columns of `rows` in place."""
+    radii, angles, labels = engine.calculate_polar_coordinates_batch(
+        (row.get("Journal") or "" for row in rows), batch_size
+    )
+    for row, radius, angle, label in zip(rows, radii, angles, labels):
+        row["Radius"] = round(float(radius), 4)
+        row["Angle"] = round(float(angle), 2)
+        row["Emotion"] = label
+        row["Energy"] = EMOTION_MAP.get(label, {}).get("energy", "N/A")
+
+
+def rescore_file(
+    engine: ValenceEngine | ParallelScorer,
+    input_path: str,
+    output_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = ENCODE_BATCH_SIZE,
+    resume: bool = True,
+) -> int:
+    """
+    Re-score one CSV, streaming it chunk by chunk.
+
+    Args:
+        engine: Engine (or process pool) used for scoring
+        input_path: Exported journal CSV
+        output_path: Destination CSV (same columns, scored columns updated)
+        chunk_size: Rows per engine batch call
+        batch_size: Sentences per encoder forward pass
+        resume: Continue from an existing checkpoint instead of starting over
+            (ignored if it was written with a different engine configuration)
+
+    Returns:
+        Number of rows written by this run
+    """
+    # Writing over the input would truncate it mid-read (and read back our own output)
+    if os.path.realpath(output_path) == os.path.realpath(input_path) or (
+        os.path.exists(output_path) and os.path.samefile(output_path, input_path)
+    ):
+        raise ValueError(f"{input_path}: output path is the input file; choose another --output-dir")
+
+    engine_fingerprint = engine.result_fingerprint
+    checkpoint = load_checkpoint(input_path, output_path, engine_fingerprint) if resume else None
+    rows_done = checkpoint["rows_done"] if checkpoint else 0
+
+    with open(input_path, "r", newline="", encoding="utf-8") as fin:
+        reader = csv.DictReader(fin)
+        if not reader.fieldnames or "Journal" not in reader.fieldnames:
+            raise ValueError(f"{input_path}: missing 'Journal' column")
+        fieldnames = list(reader.fieldnames) + [c for c in SCORED_COLUMNS if c not in reader.fieldnames]
+
+        if checkpoint:
+            # Drop anything written after the last checkpoint, then skip done rows
+            os.truncate(output_path, checkpoint["output_offset"])
+            fout = open(output_path, "a", newline="", encoding="utf-8")
+            for _ in range(rows_done):
+                next(reader)
+            print(f"{input_path}: resuming after {rows_done} rows")
+        else:
+            fout = open(output_path, "w", newline="", encoding="utf-8")
+
+        written = 0
+        with fout:
+            writer = csv.DictWriter(fout, fieldnames=fieldnames)
+            if not checkpoint:
+                writer.writeheader()
+
+            for chunk in iter_chunks(reader, chunk_size):
+                rescore_rows(engine, chunk, batch_size)
+                writer.writerows(chunk)
+                fout.flush()
+                written += len(chunk)
+                save_checkpoint(input_path, output_path, rows_done + written, fout.tell(), engine_fingerprint)
+                print(f"{input_path}: {rows_done + written} rows re-scored")
+
+    if os.path.exists(_checkpoint_path(output_path)):
+        os.remove(_checkpoint_path(output_path))
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score exported journal CSVs with the valence engine.")
+    parser.add_argument("inputs", nargs="+", help="Exported journal CSV files")
+    parser.add_argument("--output-dir", help="Directory for re-scored files (default: <name>_rescored.csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per scoring batch")
+    parser.add_argument("--batch-size", type=int, default=ENCODE_BATCH_SIZE, help="Sentences per forward pass")
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS, help="Encoder backend")
+    parser.add_argument("--workers", type=int, default=0, help="Scoring processes (0 = score in this process)")
+    parser.add_argument("--threads-per-worker", type=int, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints and start over")
+    parser.add_argument("--result-cache", default=DEFAULT_RESULT_CACHE,
+                        help="SQLite result cache shared across runs and workers (default: VALENCE_RESULT_CACHE)")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.workers > 0:
+        engine = ParallelScorer(
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            model_name=args.model,
+            backend=args.backend,
+            persistent_cache=args.result_cache,
+        ).start()
+    else:
+        engine = ValenceEngine(model_name=args.model, backend=args.backend, persistent_cache=args.result_cache)
+
+    try:
+        return _rescore_inputs(engine, args)
+    finally:
+        if isinstance(engine, ParallelScorer):
+            engine.close()
+
+
+def _rescore_inputs(engine: ValenceEngine | ParallelScorer, args: argparse.Namespace) -> int:
+    total = 0
+    for input_path in args.inputs:
+        output_path = output_path_for(input_path, args.output_dir)
+        try:
+            total += rescore_file(
+                engine,
+                input_path,
+                output_path,
+                chunk_size=args.chunk_size,
+                batch_size=args.batch_size,
+                resume=not args.no_resume,
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Wrote {output_path}")
+
+    print(f"Done: {total} rows re-scored.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Persistent Result Cache for The Polar Emotion Compass
+======================================================
+Disk-backed (radius, angle, emotion) results, so re-scoring identical
+entries after a restart or in a nightly job costs a lookup, not a forward pass.
+
+Key Features:
+- Keyed by a hash of the normalised text plus an engine fingerprint: model,
+  encoder backend, EMOTION_MAP, thresholds, chunking and scoring options.
+  Changing any of them simply misses; stale rows age out. Rows from an
+  older CACHE_FORMAT are deleted when the file is opened
+- Looked up before any encoding, in one query per batch
+- Bounded size: least-recently-used rows are evicted past `max_entries`
+- SQLite in WAL mode with a busy timeout: safe for many worker processes
+  (and threads) reading and writing the same file
+- Local file only (VALENCE_RESULT_CACHE enables it for every engine)
+
+Usage:
+    engine = ValenceEngine(persistent_cache="results.sqlite")
+    python rescore.py exports/*.csv --result-cache results.sqlite
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_FORMAT = 2                  # Bump when scoring semantics or text keys change without a parameter change
+MAX_ENTRIES = 1_000_000           # Rows kept before LRU eviction
+EVICT_CHECK_EVERY = 10_000        # Inserts between size checks
+TOUCH_INTERVAL_S = 3600           # Hits refresh last_used at most this often (keeps reads read-only)
+BUSY_TIMEOUT_MS = 30_000          # Wait this long for another process's write lock
+SQL_VARIABLES = 900               # Keys per IN (...) query, under SQLite's parameter limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       BLOB PRIMARY KEY,       -- blake2b(fingerprint, text key)
+    radius    REAL NOT NULL,
+    angle     REAL NOT NULL,
+    emotion   TEXT NOT NULL,
+    last_used REAL NOT NULL           -- Unix seconds, for LRU eviction
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def engine_fingerprint(engine) -> str:
+    """
+    Hash of everything besides the text that determines an engine's result.
+
+    Covers model name and backend, the full emotion map, the three
+    thresholds, chunking, the lexical fast path and the exemplar bank
+    (its manifest when given as a directory). Model weights changed in place
+    under the same name are not detected; bump CACHE_FORMAT or clear the file.
+    """
+    exemplars = engine.exemplar_index
+    if engine.exemplar_path is not None:
+        # Same key before and after load() swaps in the ExemplarIndex
+        with open(os.path.join(engine.exemplar_path, "exemplars.json"), "rb") as f:
+            exemplars = hashlib.sha256(f.read()).hexdigest()
+    elif exemplars is not None:
+        exemplars = [exemplars.labels, exemplars.counts.tolist(), exemplars.pooling, exemplars.probe, exemplars.texts]
+
+    params = {
+        "format": CACHE_FORMAT,
+        "model": engine.model_name,
+        "backend": engine.backend,
+        "emotion_map": engine.emotion_map,
+        "guardrail": engine.guardrail_threshold,
+        "score": engine.score_threshold,
+        "angular": engine.angular_threshold,
+        "min_chunk_tokens": engine.min_chunk_tokens,
+        "fast_path": engine.lexicon is not None,
+        "exemplars": exemplars,
+    }
+    encoded = json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PersistentResultCache:
+    """
+    SQLite-backed result cache shared by processes on one host.
+
+    Connections are opened lazily per process, so an instance (or its path)
+    can be handed to forked or spawned workers.
+
+    Args:
+        path: SQLite file (created with its schema if missing)
+        max_entries: Rows kept before least-recently-used rows are evicted
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._inserts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection (reopened after a fork)."""
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe; a lost cache row is harmless
+            with conn:
+                conn.executescript(_SCHEMA)
+            self._discard_old_format(conn)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _discard_old_format(conn: sqlite3.Connection) -> None:
+        """Drop rows written by an older CACHE_FORMAT; they can never be matched again."""
+        row = conn.execute("SELECT value FROM meta WHERE name = 'format'").fetchone()
+        if row is None or int(row[0]) < CACHE_FORMAT:
+            with conn:
+                conn.execute("DELETE FROM results")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?)", (str(CACHE_FORMAT),))
+
+    def __getstate__(self) -> dict:
+        # Workers open their own connection
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"], state["max_entries"])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key(fingerprint: str, text_key: str) -> bytes:
+        """Row key for one entry under one engine configuration."""
+        return hashlib.blake2b(f"{fingerprint}\0{text_key}".encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, keys: list[bytes]) -> list[tuple[float, float, str] | None]:
+        """
+        Cached results for `keys` (None where missing), in order.
+
+        Returns:
+            One (radius, angle, emotion) tuple or None per key
+        """
+        if not keys:
+            return []
+        found = {}
+        now = time.time()
+        stale = []
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), SQL_VARIABLES):
+                block = keys[i:i + SQL_VARIABLES]
+                placeholders = ",".join("?" * len(block))
+                for key, radius, angle, emotion, last_used in conn.execute(
+                    f"SELECT key, radius, angle, emotion, last_used FROM results WHERE key IN ({placeholders})", block
+                ):
+                    found[key] = (radius, angle, emotion)
+                    if now - last_used > TOUCH_INTERVAL_S:
+                        stale.append(key)
+            if stale:
+                with conn:
+                    conn.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(now, k) for k in stale])
+            results = [found.get(key) for key in keys]
+            n_hits = sum(r is not None for r in results)
+            self.hits += n_hits
+            self.misses += len(keys) - n_hits
+        return results
+
+    def get(self, key: bytes) -> tuple[float, float, str] | None:
+        return self.get_many([key])[0]
+
+    def put_many(self, items: list[tuple[bytes, tuple[float, float, str]]]) -> None:
+        """Store (key, (radius, angle, emotion)) pairs in one transaction."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, float(r), float(a), str(label), now) for key, (r, a, label) in items]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+            self._inserts += len(rows)
+            if self._inserts >= min(EVICT_CHECK_EVERY, max(1, self.max_entries // 10)):
+                self._inserts = 0
+                self._evict(conn)
+
+    def put(self, key: bytes, result: tuple[float, float, str]) -> None:
+        self.put_many([(key, result)])
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least-recently-used rows beyond max_entries."""
+        excess = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+        if excess > 0:
+            with conn:
+                conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)", (excess,)
+                )
+            self.evictions += excess
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM results")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
@@ -0,0 +1,310 @@
+"""
+Local Scoring Service for The Polar Emotion Compass
+====================================================
+Small HTTP server that shares one `ValenceEngine` between local clients
+(therapist dashboard, mobile backend) instead of each loading MiniLM.
+
+Key Features:
+- Dynamic micro-batching: concurrent requests are queued and coalesced into
+  one encoder pass, bounded by max batch size and max wait time
+- Endpoints:
+    POST /score        {"text": "..."}        -> {"radius", "angle", "emotion"}
+    POST /score/batch  {"texts": ["...", ...]} -> {"results": [...]}
+    GET  /health       liveness, always 200 (includes "ready")
+    GET  /ready        200 once every replica is loaded and warmed up, else 503
+- Engine replicas (`engine_pool.EnginePool`): one batching worker per
+  replica, torch threads split between them, warmed up before serving
+- Binds to 127.0.0.1 by default: journal text never leaves the machine
+
+Usage:
+    python scoring_server.py --port 8765 --max-batch-size 64 --max-wait-ms 10
+    python scoring_server.py --replicas 2 --intra-op-threads 4
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from engine_pool import DEFAULT_INTER_OP_THREADS, DEFAULT_INTRA_OP_THREADS, DEFAULT_REPLICAS, EnginePool
+from valence_engine import ENCODER_BACKENDS, MODEL_NAME, ValenceEngine
+
+MAX_BATCH_SIZE = 64       # Entries per coalesced engine call
+MAX_WAIT_MS = 10.0        # How long the first queued entry waits for company
+MAX_BODY_BYTES = 1 << 20  # Reject request bodies larger than 1 MiB
+REQUEST_TIMEOUT_S = 60.0  # Give up on a queued entry after this long
+
+
+class MicroBatcher:
+    """
+    Coalesces individually submitted texts into batched engine calls.
+
+    One background thread per engine replica takes the first queued text,
+    keeps collecting until `max_batch_size` texts are waiting or
+    `max_wait_ms` has passed, then scores them all with one
+    `calculate_polar_coordinates_batch` call on a borrowed replica.
+
+    Args:
+        pool: Engine replicas used for scoring
+        max_batch_size: Maximum texts per engine call
+        max_wait_ms: Maximum time the oldest queued text waits before its batch runs
+    """
+
+    def __init__(self, pool: EnginePool, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.batches_run = 0
+        self.entries_scored = 0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> "MicroBatcher":
+        if not self._threads:
+            self._threads = [
+                threading.Thread(target=self._run, name=f"micro-batcher-{i}", daemon=True)
+                for i in range(self.pool.replicas)
+            ]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self) -> None:
+        # One sentinel per worker: each worker exits on the first one it sees
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the returned future resolves to (radius, angle, emotion)."""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self, first: tuple) -> tuple[list, bool]:
+        """Gather a batch starting with `first`. Returns (batch, stop_requested)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+
+            texts = [text for text, _ in batch]
+            try:
+                with self.pool.acquire() as engine:
+                    radii, angles, labels = engine.calculate_polar_coordinates_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), r, a, label in zip(batch, radii, angles, labels):
+                    future.set_result((float(r), float(a), str(label)))
+                with self._stats_lock:
+                    self.batches_run += 1
+                    self.entries_scored += len(batch)
+
+            if stop:
+                return
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints; `self.server` carries the engine pool and batcher."""
+
+    server_version = "PolarEmotionCompass/1.0"
+
+    def log_message(self, format, *args):
+        # Default logging would print client addresses for every request
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict | None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return None
+        if length < 0:
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return None
+        if length == 0 or length > MAX_BODY_BYTES:
+            self._send_json(413 if length > MAX_BODY_BYTES else 400, {"error": "invalid body size"})
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_json(400, {"error": "body must be JSON"})
+            return None
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "body must be a JSON object"})
+            return None
+        return payload
+
+    def do_GET(self):
+        pool = self.server.pool
+        if self.path == "/health":
+            batcher = self.server.batcher
+            self._send_json(200, {
+                "status": "ok",
+                "ready": pool.is_ready,
+                "replicas": pool.replicas,
+                "threads_per_replica": pool.threads_per_replica,
+                "batches_run": batcher.batches_run,
+                "entries_scored": batcher.entries_scored,
+                "fast_path": pool.fast_path_stats(),
+            })
+        elif self.path == "/ready":
+            payload = {"ready": pool.is_ready}
+            if pool.error is not None:
+                payload["error"] = str(pool.error)
+            self._send_json(200 if pool.is_ready else 503, payload)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path not in ("/score", "/score/batch"):
+            self._send_json(404, {"error": "not found"})
+            return
+        if not self.server.pool.is_ready:
+            self._send_json(503, {"error": "model is still loading"})
+            return
+
+        payload = self._read_json()
+        if payload is None:
+            return
+
+        if self.path == "/score":
+            texts = [payload.get("text")]
+        else:
+            texts = payload.get("texts")
+            if not isinstance(texts, list):
+                self._send_json(400, {"error": "'texts' must be a list of strings"})
+                return
+        if not all(isinstance(t, str) for t in texts):
+            self._send_json(400, {"error": "text values must be strings"})
+            return
+
+        futures = [self.server.batcher.submit(t) for t in texts]
+        try:
+            results = [f.result(timeout=REQUEST_TIMEOUT_S) for f in futures]
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        results = [{"radius": r, "angle": a, "emotion": label} for r, a, label in results]
+        if self.path == "/score":
+            self._send_json(200, results[0])
+        else:
+            self._send_json(200, {"results": results})
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """Threading HTTP server holding the engine pool and micro-batcher."""
+
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog; the socketserver default of 5 drops bursts
+
+    def __init__(self, address: tuple[str, int], pool: EnginePool, batcher: MicroBatcher):
+        super().__init__(address, ScoringRequestHandler)
+        self.pool = pool
+        self.batcher = batcher
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    engine: ValenceEngine | None = None,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_wait_ms: float = MAX_WAIT_MS,
+    pool: EnginePool | None = None,
+) -> ScoringServer:
+    """
+    Build a server and start loading and warming up the model in the background.
+
+    `/ready` reports 503 until every replica is warm; scoring requests are
+    refused with 503 until then.
+
+    Args:
+        engine: Single engine to serve (ignored if `pool` is given)
+        pool: Engine replicas to serve (default: one replica)
+    """
+    if pool is None:
+        pool = EnginePool(engines=[engine]) if engine is not None else EnginePool(replicas=1)
+    batcher = MicroBatcher(pool, max_batch_size, max_wait_ms).start()
+    pool.start()
+    return ScoringServer((host, port), pool, batcher)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local HTTP scoring service with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS, help="Encoder backend")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Answer entries that name a single emotion without running the model")
+    parser.add_argument("--replicas", type=int, default=DEFAULT_REPLICAS, help="Engine replicas (default: 1)")
+    parser.add_argument("--intra-op-threads", type=int, default=DEFAULT_INTRA_OP_THREADS,
+                        help="torch threads per replica (default: torch's own)")
+    parser.add_argument("--inter-op-threads", type=int, default=DEFAULT_INTER_OP_THREADS,
+                        help="torch inter-op threads (default: torch's own)")
+    args = parser.parse_args(argv)
+
+    pool = EnginePool(
+        replicas=args.replicas,
+        threads_per_replica=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+        model_name=args.model,
+        backend=args.backend,
+        fast_path=args.fast_path,
+    )
+    server = create_server(
+        args.host,
+        args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        pool=pool,
+    )
+    print(f"Scoring service listening on http://{args.host}:{args.port} "
+          f"({pool.replicas} replica(s) x {pool.threads_per_replica or 'default'} threads)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Streaming Scoring for The Polar Emotion Compass
+================================================
+Scores very long documents (full therapy-session transcripts) window by
+window instead of splitting the whole text up front.
+
+Key Features:
+- Reads a string or file-like object lazily in fixed-size blocks
+- Encodes a fixed number of sentences per window (memory bounded by the
+  window, not the document)
+- Yields each window's polar result plus the running winning sentence,
+  which after the last window matches scoring the whole document at once
+  (chunks never span windows, so merges at window edges can differ)
+
+Usage:
+    for update in stream_polar_coordinates(engine, open("session.txt")):
+        print(update["window"], update["emotion"], update["running_emotion"])
+
+    python streaming.py session.txt --window 64
+"""
+
+import argparse
+import io
+import sys
+from typing import Iterator, TextIO
+
+import numpy as np
+
+from valence_engine import ENCODER_BACKENDS, MODEL_NAME, SENTENCE_BOUNDARY, ValenceEngine
+
+WINDOW_SENTENCES = 64       # Sentences encoded per window
+READ_SIZE = 64 * 1024       # Characters read from the source per block
+MAX_PENDING_CHARS = 20_000  # Flush text without sentence punctuation beyond this
+
+
+def iter_sentences(
+    source: str | TextIO,
+    read_size: int = READ_SIZE,
+    max_pending_chars: int = MAX_PENDING_CHARS,
+) -> Iterator[str]:
+    """
+    Lazily split a text source into sentences (same rule as `split_sentences`).
+
+    Args:
+        source: Text, or a file-like object opened in text mode
+        read_size: Characters read per block
+        max_pending_chars: Longest unterminated run kept in memory; longer runs
+            are cut at the last whitespace and yielded as a sentence
+
+    Yields:
+        Stripped, non-empty sentences in document order
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    pending = ""
+    while True:
+        block = source.read(read_size)
+        if not block:
+            break
+        pieces = SENTENCE_BOUNDARY.split(pending + block)
+        # The last piece may continue in the next block
+        pending = pieces.pop()
+        for piece in pieces:
+            piece = piece.strip()
+            if piece:
+                yield piece
+        while len(pending) > max_pending_chars:
+            cut = pending.rfind(" ", 0, max_pending_chars)
+            cut = cut if cut > 0 else max_pending_chars
+            head, pending = pending[:cut].strip(), pending[cut:].lstrip()
+            if head:
+                yield head
+
+    pending = pending.strip()
+    if pending:
+        yield pending
+
+
+def _windows(sentences: Iterator[str], size: int) -> Iterator[list[str]]:
+    window = []
+    for sentence in sentences:
+        window.append(sentence)
+        if len(window) == size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def stream_polar_coordinates(
+    engine: ValenceEngine,
+    source: str | TextIO,
+    window_sentences: int = WINDOW_SENTENCES,
+    read_size: int = READ_SIZE,
+) -> Iterator[dict]:
+    """
+    Score a long document window by window.
+
+    Window embeddings bypass the engine's LRU caches: transcript sentences
+    are rarely repeated and would only evict journal entries.
+
+    Args:
+        engine: Engine used for chunking, encoding and blending
+        source: Text, or a file-like object opened in text mode
+        window_sentences: Sentences encoded per window
+        read_size: Characters read from `source` per block
+
+    Yields:
+        One dict per window:
+            window, first_sentence, n_sentences: window position (chunks)
+            radius, angle, emotion, sentence, score: this window's result
+            running_radius, running_angle, running_emotion, running_sentence,
+            running_score: result for everything read so far
+    """
+    running_score = -np.inf
+    running_sentence = None
+    running = (0.0, 0.0, "Neutral")
+    first_sentence = 0
+
+    for window_idx, fragments in enumerate(_windows(iter_sentences(source, read_size), window_sentences)):
+        timer = engine.profiler.start_call("stream")
+        chunks = engine.chunker.chunk_fragments([fragments])[0]
+        timer.mark("split")
+
+        embeddings = engine.encode_sentences(chunks)
+        timer.mark("encode")
+        similarity_matrix = engine.cosine_similarity_matrix(embeddings)
+        sentence_max_scores = similarity_matrix.max(axis=1)
+        winning_idx = int(np.argmax(sentence_max_scores))
+        score = float(sentence_max_scores[winning_idx])
+        timer.mark("similarity")
+
+        if score < engine.guardrail_threshold:
+            result = (0.0, 0.0, "Neutral")
+        else:
+            result = engine.blend_winning_row(similarity_matrix[winning_idx])
+
+        # Strictly greater: the earliest sentence keeps the lead on ties
+        if score > running_score:
+            running_score = score
+            running_sentence = chunks[winning_idx]
+            running = result
+        timer.mark("blend")
+        engine._finish_call(timer, chunks, window=window_idx)
+
+        radius, angle, emotion = result
+        running_radius, running_angle, running_emotion = running
+        yield {
+            "window": window_idx,
+            "first_sentence": first_sentence,
+            "n_sentences": len(chunks),
+            "radius": float(radius),
+            "angle": float(angle),
+            "emotion": emotion,
+            "sentence": chunks[winning_idx],
+            "score": score,
+            "running_radius": float(running_radius),
+            "running_angle": float(running_angle),
+            "running_emotion": running_emotion,
+            "running_sentence": running_sentence,
+            "running_score": running_score,
+        }
+        first_sentence += len(chunks)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a long transcript through the valence engine.")
+    parser.add_argument("path", help="Text file to score ('-' for stdin)")
+    parser.add_argument("--window", type=int, default=WINDOW_SENTENCES, help="Sentences per window")
+    parser.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    parser.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS)
+    args = parser.parse_args(argv)
+
+    engine = ValenceEngine(model_name=args.model, backend=args.backend).load()
+    source = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8")
+    update = None
+    try:
+        for update in stream_polar_coordinates(engine, source, args.window):
+            print(f"window {update['window']:>4} | sentences {update['first_sentence']:>6}+{update['n_sentences']:<3} "
+                  f"| {update['emotion']:<12} r={update['radius']:.3f} a={update['angle']:6.1f}° "
+                  f"| running: {update['running_emotion']}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if update is None:
+        print("Neutral — no sentences found.")
+    else:
+        print(f"Overall: {update['running_emotion']} (r={update['running_radius']:.3f}, "
+              f"a={update['running_angle']:.1f}°) from: {update['running_sentence'][:80]!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,63 +3,142 @@ Test Suite for The Polar Emotion Compass
 =========================================
 Tests the Angular Guardrail with 10 comprehensive test cases.
 Outputs expected vs actual results to 'test_results.txt'.
+
+Also checks that:
+- batch and draft scoring agree with the single-entry path on every case
+- the result cache keeps multi-line entries apart from single-line variants
+- the lexical fast path leaves negated entries to the model
+- warm-up with a partial exemplar bank raises no numpy warnings
 """
 
-from valence_engine import calculate_polar_coordinates
-
-# 10 comprehensive test cases with expected outputs
-test_cases = [
-    {
-        "name": "Stolen Web App Code",
-        "text": "My teammate took credit for the web app code I wrote. I feel betrayed and furious about this situation.",
-        "expected": "Furious / Infuriated"
-    },
-    {
-        "name": "Dream School Acceptance",
-        "text": "I just got accepted into my dream college! I'm so excited and proud of myself!",
-        "expected": "Excited / Euphoric"
-    },
-    {
-        "name": "Overwhelming Final Exams",
-        "text": "Final exams are next week and I haven't studied enough. I'm anxious and overwhelmed by everything.",
-        "expected": "Overwhelmed / Anxious"
-    },
-    {
-        "name": "Peaceful Weekend Morning",
-        "text": "Woke up on Saturday with no deadlines. Just relaxing with coffee and music. I feel peaceful and content.",
-        "expected": "Peaceful / Content"
-    },
-    {
-        "name": "Loss of a Loved One",
-        "text": "I lost my grandfather yesterday and the house feels so empty. I miss him so much, I feel incredibly sad and lonely.",
-        "expected": "Grief / Sad"
-    },
-    {
-        "name": "Forgot Best Friend's Birthday",
-        "text": "I completely forgot my best friend's birthday. I feel like a terrible person, so guilty and ashamed.",
-        "expected": "Guilty / Ashamed"
-    },
-    {
-        "name": "Imposter Syndrome",
-        "text": "Everyone in my class seems so much smarter than me. I feel inadequate and insecure about my abilities.",
-        "expected": "Inadequate / Insecure"
-    },
-    {
-        "name": "Unexpected Kindness",
-        "text": "My neighbor helped me fix my flat tire in the rain without me even asking. I'm so grateful and touched by their kindness.",
-        "expected": "Grateful"
-    },
-    {
-        "name": "Mixed Emotions - Close Angles (Should Blend)",
-        "text": "I'm excited about the new job but also nervous about meeting expectations.",
-        "expected": "Excited (blended with Nervous if close enough)"
-    },
-    {
-        "name": "Conflicting Emotions - Far Angles (Should NOT Blend)",
-        "text": "I'm happy I graduated but sad to leave my friends behind forever.",
-        "expected": "Happy (snapped, NOT blended with Sad)"
+import tempfile
+import warnings
+
+from anchor_index import build_exemplar_index
+from corpus import TEST_CASES
+from lexicon import LexicalMatcher
+from valence_engine import DraftScorer, ValenceEngine, calculate_polar_coordinates, split_sentences, text_key
+
+# Batch blending runs in float32, so paths may differ by rounding noise
+RADIUS_TOLERANCE = 1e-4
+ANGLE_TOLERANCE = 1e-3  # degrees
+
+# 10 comprehensive test cases with expected outputs (kept in corpus.py for the tools)
+test_cases = TEST_CASES
+
+
+def _section_header(title):
+    return "=" * 80 + "\n" + title + "\n" + "=" * 80 + "\n\n"
+
+
+def _same_result(a, b):
+    """True if two (radius, angle, emotion) results agree up to float32 rounding."""
+    return (
+        a[2] == b[2]
+        and abs(float(a[0]) - float(b[0])) <= RADIUS_TOLERANCE
+        and abs(float(a[1]) - float(b[1])) <= ANGLE_TOLERANCE
+    )
+
+
+def _format_result(result):
+    return f"{result[2]} (Intensity={float(result[0]):.4f}, Angle={float(result[1]):.2f}°)"
+
+
+def check_scoring_paths(single_results, check_engine):
+    """Batch and draft scoring must match the single-entry path on every case."""
+    check_str = _section_header("CONSISTENCY CHECK - BATCH AND DRAFT SCORING VS calculate_polar_coordinates")
+    texts = [test_case['text'] for test_case in test_cases]
+    radii, angles, emotions = check_engine.calculate_polar_coordinates_batch(texts)
+    draft_scorer = DraftScorer(check_engine)
+    paths = {
+        "batch": list(zip(radii, angles, emotions)),
+        "draft": [draft_scorer.calculate_polar_coordinates(text) for text in texts],
     }
-]
+
+    mismatches = 0
+    for path_name, results in paths.items():
+        for i, (test_case, expected, actual) in enumerate(zip(test_cases, single_results, results), 1):
+            if not _same_result(actual, expected):
+                mismatches += 1
+                check_str += (
+                    f"MISMATCH ({path_name}) Test Case {i}: {test_case['name']}\n"
+                    f"  Single: {_format_result(expected)}\n"
+                    f"  {path_name.capitalize()}:  {_format_result(actual)}\n"
+                )
+    check_str += (
+        f"{mismatches} mismatch(es) across {len(test_cases)} cases x {len(paths)} paths "
+        f"({', '.join(paths)})\n"
+    )
+    return check_str
+
+
+def check_cache_keys(check_engine):
+    """A cached single-line entry must not be served for its multi-line variant."""
+    check_str = _section_header("CACHE KEY CHECK - NEWLINES ARE SENTENCE BOUNDARIES")
+    multi_line = "I was happy this morning\nthen I got so angry at work"
+    single_line = multi_line.replace("\n", " ")
+
+    cached_engine = ValenceEngine(persistent_cache=None)
+    cached_engine.calculate_polar_coordinates(single_line)  # Fills the result cache first
+    failures = 0
+    for text in (single_line, multi_line):
+        expected = check_engine.calculate_polar_coordinates(text)
+        actual = cached_engine.calculate_polar_coordinates(text)
+        if _same_result(actual, expected):
+            check_str += f"OK: {text!r}\n"
+        else:
+            failures += 1
+            check_str += (
+                f"MISMATCH: {text!r}\n"
+                f"  Uncached: {_format_result(expected)}\n"
+                f"  Cached:   {_format_result(actual)}\n"
+            )
+    if text_key(multi_line) == text_key(single_line):
+        failures += 1
+        check_str += "MISMATCH: both variants share one cache key\n"
+    check_str += f"{failures} failure(s)\n"
+    return check_str
+
+
+def check_fast_path_negation():
+    """Negated entries (curly apostrophes, negation after the emotion word) must reach the model."""
+    check_str = _section_header("FAST PATH CHECK - NEGATION FALLS THROUGH TO THE MODEL")
+    matcher = LexicalMatcher()
+    cases = [
+        ("I don\u2019t feel happy", None),
+        ("I can\u2019t say I am happy", None),
+        ("I was happy until I wasn't", None),
+        ("I feel so happy", "Happy"),
+    ]
+    failures = 0
+    for text, expected in cases:
+        result = matcher.match(split_sentences(text))
+        actual = result[2] if result else None
+        status = "OK" if actual == expected else "MISMATCH"
+        failures += status != "OK"
+        check_str += f"{status}: {text!r} -> {actual or 'model'} (expected {expected or 'model'})\n"
+    check_str += f"{failures} failure(s)\n"
+    return check_str
+
+
+def check_exemplar_warm_up(check_engine):
+    """Warm-up with an exemplar bank must not warn (emotions without exemplars score -inf)."""
+    check_str = _section_header("EXEMPLAR WARM-UP CHECK - NO NUMPY WARNINGS")
+    # One emotion only, so every runner-up score is -inf
+    phrases = {"Anxious": ["I am worried about tomorrow", "I can't stop overthinking"]}
+    with tempfile.TemporaryDirectory() as directory:
+        build_exemplar_index(check_engine, phrases, directory)
+        bank_engine = ValenceEngine(exemplar_index=directory, result_cache_size=0, persistent_cache=None)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                bank_engine.warm_up()
+            check_str += "OK: warm-up ran with warnings treated as errors\n"
+        except Warning as e:
+            check_str += f"FAILED: {type(e).__name__}: {e}\n"
+        del bank_engine  # Release the memory-mapped bank before the directory is removed
+    return check_str
+
 
 def run_tests():
     output_filename = "test_results.txt"
@@ -75,9 +154,11 @@ def run_tests():
         print(header)
         f.write(header)
         
+        single_results = []
         for i, test_case in enumerate(test_cases, 1):
             # Calculate emotion
             radius, angle, actual_emotion = calculate_polar_coordinates(test_case['text'])
+            single_results.append((radius, angle, actual_emotion))
             
             # Format output
             result_str = (
@@ -94,6 +175,17 @@ def run_tests():
             print(result_str)
             f.write(result_str)
         
+        # Uncached, so results are recomputed rather than served from the runs above
+        check_engine = ValenceEngine(result_cache_size=0, persistent_cache=None)
+        for check_str in (
+            check_scoring_paths(single_results, check_engine),
+            check_cache_keys(check_engine),
+            check_fast_path_negation(),
+            check_exemplar_warm_up(check_engine),
+        ):
+            print(check_str)
+            f.write(check_str + "\n")
+
         # Summary
         summary = f"\n{'=' * 80}\nTest results saved to: {output_filename}\n{'=' * 80}\n"
         print(summary)
@@ -0,0 +1,452 @@
+"""
+Offline Threshold Tuning for The Polar Emotion Compass
+=======================================================
+Encode a corpus once, then replay the scoring rules for whole grids of
+GUARDRAIL_THRESHOLD / SCORE_THRESHOLD / ANGULAR_THRESHOLD values in seconds,
+without running the model again.
+
+Key Features:
+- Export: sentence x anchor similarity matrix (float32 or float16) written
+  block by block to a memory-mapped file, with entry offsets and a manifest;
+  optionally the float16 sentence embeddings too
+- The `corpus.py` test cases are exported alongside the corpus with their expected
+  labels, so every grid point reports agreement with them
+- Replay: winning sentence per entry and Top-2 candidates are computed once
+  (they do not depend on the thresholds); the guardrail / score / angular
+  rules are then broadcast over the whole grid
+- Per grid point: label distribution, Neutral share, blend rate, label
+  changes and mean angle shift against the current thresholds, and test
+  agreement
+
+With the current rules the top-1 label depends only on the guardrail; the
+score and angular thresholds move radius and angle (blending).
+
+Usage:
+    python threshold_tuning.py export --corpus exports.csv --output tuning/
+    python threshold_tuning.py replay tuning/ --guardrail 0.15:0.35:0.01 --json grid.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from contextlib import ExitStack
+
+import numpy as np
+
+from anchor_cache import _atomic_write
+from valence_engine import (
+    ANGULAR_THRESHOLD,
+    ENCODER_BACKENDS,
+    GUARDRAIL_THRESHOLD,
+    MODEL_NAME,
+    SCORE_THRESHOLD,
+    ValenceEngine,
+)
+
+EXPORT_VERSION = 1
+EXPORT_BLOCK_ENTRIES = 2048   # Entries encoded per block while exporting
+REPLAY_BLOCK_ENTRIES = 65536  # Entries reduced per block while replaying
+SIMILARITY_DTYPES = ("float32", "float16")
+
+# Default grids: current values sit on each grid
+GUARDRAIL_GRID = np.round(np.arange(0.10, 0.405, 0.02), 2)
+SCORE_GRID = np.round(np.arange(0.50, 0.955, 0.05), 2)
+ANGULAR_GRID = np.array([30, 45, 60, 75, 90])
+
+
+def _paths(directory: str) -> dict:
+    return {
+        "similarity": os.path.join(directory, "similarity.bin"),
+        "embeddings": os.path.join(directory, "embeddings.bin"),
+        "offsets": os.path.join(directory, "offsets.npy"),
+        "manifest": os.path.join(directory, "manifest.json"),
+    }
+
+
+def expected_labels(expected: str, labels: list[str]) -> list[str]:
+    """
+    Acceptable labels from a `corpus.py` expectation string.
+
+    "Furious / Infuriated" -> [Furious, Infuriated]; anything in
+    parentheses ("(blended with Nervous ...)") is commentary and ignored.
+    """
+    head = expected.split("(")[0]
+    words = {w.strip().lower() for w in re.split(r"[/,]", head)}
+    return [label for label in labels if label.lower() in words]
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def export_similarities(
+    engine: ValenceEngine,
+    texts: list[str],
+    directory: str,
+    expected: list[list[str]] | None = None,
+    corpus_entries: int | None = None,
+    dtype: str = "float32",
+    save_embeddings: bool = False,
+    block_entries: int = EXPORT_BLOCK_ENTRIES,
+) -> dict:
+    """
+    Encode `texts` once and write their similarity matrix to `directory`.
+
+    Files: similarity.bin (n_sentences, n_anchors) raw `dtype`, offsets.npy
+    (entry i owns rows offsets[i]:offsets[i+1]), optional embeddings.bin
+    (float16) and manifest.json, written last so a partial export is never loaded.
+
+    Args:
+        engine: Engine whose model, chunking and anchors are exported
+        texts: Journal texts
+        directory: Output directory (created if missing)
+        expected: Acceptable labels per text (None where unknown)
+        corpus_entries: Leading texts that form the corpus proper (the rest,
+            e.g. test cases, are left out of label distributions); default all
+        dtype: "float32" (exact replay) or "float16" (half the size)
+        save_embeddings: Also write the sentence embeddings
+        block_entries: Entries encoded per block (bounds memory)
+
+    Returns:
+        The manifest
+    """
+    if dtype not in SIMILARITY_DTYPES:
+        raise ValueError(f"Unknown dtype {dtype!r}; expected one of {SIMILARITY_DTYPES}")
+    os.makedirs(directory, exist_ok=True)
+    paths = _paths(directory)
+    if os.path.exists(paths["manifest"]):
+        os.remove(paths["manifest"])  # Invalidate any previous export first
+
+    offsets = [0]
+    dim = None
+    with ExitStack() as stack:
+        sim_file = stack.enter_context(open(paths["similarity"], "wb"))
+        emb_file = stack.enter_context(open(paths["embeddings"], "wb")) if save_embeddings else None
+        for start in range(0, len(texts), block_entries):
+            chunks = engine.chunk_texts(texts[start:start + block_entries])
+            sentences = [s for entry_chunks in chunks for s in entry_chunks]
+            for entry_chunks in chunks:
+                offsets.append(offsets[-1] + len(entry_chunks))
+            if not sentences:
+                continue
+            # Bypasses the LRU caches: every sentence is encoded exactly once here
+            embeddings = engine.encode_sentences(sentences)
+            dim = embeddings.shape[1]
+            np.ascontiguousarray(engine.cosine_similarity_matrix(embeddings), dtype=dtype).tofile(sim_file)
+            if emb_file is not None:
+                np.ascontiguousarray(embeddings, dtype=np.float16).tofile(emb_file)
+            print(f"Exported {min(start + block_entries, len(texts))}/{len(texts)} entries ({offsets[-1]} sentences)")
+    if not save_embeddings and os.path.exists(paths["embeddings"]):
+        os.remove(paths["embeddings"])
+
+    _atomic_write(paths["offsets"], lambda f: np.save(f, np.asarray(offsets, dtype=np.int64)))
+    manifest = {
+        "version": EXPORT_VERSION,
+        "model_name": engine.model_name,
+        "backend": engine.backend,
+        "labels": engine.emotion_labels,
+        "n_entries": len(texts),
+        "corpus_entries": len(texts) if corpus_entries is None else corpus_entries,
+        "n_sentences": offsets[-1],
+        "dtype": dtype,
+        "embedding_dim": dim,
+        "embeddings": save_embeddings,
+        "expected": expected,
+    }
+    _atomic_write(paths["manifest"], lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+    return manifest
+
+
+def load_export(directory: str) -> tuple[dict, np.ndarray, np.ndarray]:
+    """
+    Memory-map an export.
+
+    Returns:
+        (manifest, similarity memmap (n_sentences, n_anchors), offsets)
+    """
+    paths = _paths(directory)
+    with open(paths["manifest"], "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != EXPORT_VERSION:
+        raise ValueError(f"Unsupported export version in {paths['manifest']}")
+    shape = (manifest["n_sentences"], len(manifest["labels"]))
+    if shape[0]:
+        similarity = np.memmap(paths["similarity"], dtype=manifest["dtype"], mode="r", shape=shape)
+    else:
+        similarity = np.zeros(shape, dtype=manifest["dtype"])
+    return manifest, similarity, np.load(paths["offsets"])
+
+
+def load_embeddings(directory: str) -> np.ndarray | None:
+    """Memory-map exported float16 sentence embeddings (None if not exported)."""
+    manifest, _, _ = load_export(directory)
+    if not manifest["embeddings"] or not manifest["n_sentences"]:
+        return None
+    shape = (manifest["n_sentences"], manifest["embedding_dim"])
+    return np.memmap(_paths(directory)["embeddings"], dtype=np.float16, mode="r", shape=shape)
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def winning_rows(similarity: np.ndarray, offsets: np.ndarray, block_entries: int = REPLAY_BLOCK_ENTRIES) -> np.ndarray:
+    """
+    Winning-sentence similarity row per entry (first sentence on ties).
+
+    Entries without sentences get a NaN row (Neutral), as in the engine.
+
+    Returns:
+        float32 array of shape (n_entries, n_anchors)
+    """
+    n_entries = len(offsets) - 1
+    winners = np.full((n_entries, similarity.shape[1]), np.nan, dtype=np.float32)
+    for e0 in range(0, n_entries, block_entries):
+        e1 = min(e0 + block_entries, n_entries)
+        s0, s1 = offsets[e0], offsets[e1]
+        if s0 == s1:
+            continue
+        block = np.asarray(similarity[s0:s1], dtype=np.float32)
+        counts = np.diff(offsets[e0:e1 + 1])
+        entry_ids = np.repeat(np.arange(e1 - e0), counts)
+        sentence_max = block.max(axis=1)
+        entry_max = np.full(e1 - e0, -np.inf, dtype=np.float32)
+        np.maximum.at(entry_max, entry_ids, sentence_max)
+        peak_sentences = np.flatnonzero(sentence_max == entry_max[entry_ids])
+        entries, first = np.unique(entry_ids[peak_sentences], return_index=True)
+        winners[e0 + entries] = block[peak_sentences[first]]
+    return winners
+
+
+def replay_grid(
+    engine: ValenceEngine,
+    winners: np.ndarray,
+    guardrails=GUARDRAIL_GRID,
+    scores=SCORE_GRID,
+    angulars=ANGULAR_GRID,
+    expected: list[list[str] | None] | None = None,
+    corpus_entries: int | None = None,
+) -> list[dict]:
+    """
+    Re-apply guardrail + Top-2 blending for every threshold combination.
+
+    Args:
+        engine: Supplies anchor labels, radii and angles (EMOTION_MAP edits
+            to radius / angle take effect without re-exporting); its own
+            thresholds are the "current" reference
+        winners: `winning_rows` output
+        guardrails, scores, angulars: Threshold values to combine
+        expected: Acceptable labels per entry (None where unknown)
+        corpus_entries: Entries (from the start) counted in label
+            distributions; default all
+
+    Returns:
+        One dict per (guardrail, score, angular), in grid order
+    """
+    n_entries = winners.shape[0]
+    n_corpus = n_entries if corpus_entries is None else corpus_entries
+    labels = np.asarray(engine.emotion_labels, dtype=object)
+
+    # Threshold-free parts, computed once
+    with np.errstate(invalid="ignore"):
+        peak = np.max(winners, axis=1)
+    valid = np.flatnonzero(~np.isnan(peak))
+    top2 = engine.top2_candidates(winners[valid])
+    peak = peak[valid]
+    in_corpus = valid < n_corpus
+
+    expected_idx, expected_ok = None, None
+    if expected is not None:
+        expected_idx = np.array([i for i, e in enumerate(expected) if e])
+        position = {v: k for k, v in enumerate(valid)}
+        expected_ok = np.zeros((len(expected_idx), len(labels)), dtype=bool)  # Acceptable label matrix
+        label_pos = {label: k for k, label in enumerate(engine.emotion_labels)}
+        for row, i in enumerate(expected_idx):
+            for label in expected[i]:
+                if label in label_pos:
+                    expected_ok[row, label_pos[label]] = True
+        expected_valid = np.array([position.get(i, -1) for i in expected_idx])
+
+    def outcome(guardrail, score, angular):
+        active = peak >= guardrail
+        blend = active & (top2["score2"] > top2["score1"] * score) & (top2["angle_diff"] <= angular)
+        radius = np.where(active, np.minimum(1.0, np.where(blend, top2["blended_radius"], top2["radius1"])), 0.0)
+        angle = np.where(active, np.where(blend, top2["blended_angle"], top2["angle1"]), 0.0)
+        label_idx = np.where(active, top2["idx1"], -1)  # -1: Neutral
+        return active, blend, radius, angle, label_idx
+
+    _, _, _, current_angle, current_labels = outcome(
+        engine.guardrail_threshold, engine.score_threshold, engine.angular_threshold
+    )
+
+    neutral_idx = engine.emotion_labels.index("Neutral") if "Neutral" in engine.emotion_labels else None
+    results = []
+    for guardrail in guardrails:
+        for score in scores:
+            for angular in angulars:
+                active, blend, radius, angle, label_idx = outcome(float(guardrail), float(score), float(angular))
+                corpus_labels = label_idx[in_corpus]
+                counts = np.bincount(corpus_labels[corpus_labels >= 0], minlength=len(labels))
+                n_neutral = int(n_corpus - in_corpus.sum() + (corpus_labels < 0).sum())
+                if neutral_idx is not None:
+                    counts[neutral_idx] += n_neutral
+                distribution = {str(labels[k]): int(c) for k, c in enumerate(counts) if c}
+                if neutral_idx is None and n_neutral:
+                    distribution["Neutral"] = n_neutral
+
+                changed = corpus_labels != current_labels[in_corpus]
+                shift = np.abs(angle - current_angle)[in_corpus]
+                shift = np.where(shift > 180, 360 - shift, shift)
+                row = {
+                    "guardrail": float(guardrail),
+                    "score": float(score),
+                    "angular": float(angular),
+                    "neutral_share": n_neutral / n_corpus if n_corpus else 0.0,
+                    "blend_rate": float(blend[in_corpus].mean()) if in_corpus.any() else 0.0,
+                    "mean_radius": float(radius[in_corpus].mean()) if in_corpus.any() else 0.0,
+                    "label_change_rate": float(changed.mean()) if in_corpus.any() else 0.0,
+                    "mean_angle_shift": float(shift.mean()) if in_corpus.any() else 0.0,
+                    "labels": dict(sorted(distribution.items(), key=lambda kv: -kv[1])),
+                }
+                if expected_idx is not None and len(expected_idx):
+                    got = np.where(expected_valid >= 0, label_idx[np.maximum(expected_valid, 0)], -1)
+                    ok = np.where(
+                        got >= 0,
+                        expected_ok[np.arange(len(got)), np.maximum(got, 0)],
+                        expected_ok[:, neutral_idx] if neutral_idx is not None else False,
+                    )
+                    row["test_agreement"] = float(ok.mean())
+                results.append(row)
+    return results
+
+
+def replay_export(
+    directory: str,
+    guardrails=GUARDRAIL_GRID,
+    scores=SCORE_GRID,
+    angulars=ANGULAR_GRID,
+    engine: ValenceEngine | None = None,
+) -> dict:
+    """
+    Load an export and replay a threshold grid over it.
+
+    Args:
+        directory: Directory written by `export_similarities`
+        guardrails, scores, angulars: Threshold values to combine
+        engine: Reference engine (default: current EMOTION_MAP and thresholds;
+            never loads the model)
+
+    Returns:
+        JSON-serialisable report dictionary
+    """
+    manifest, similarity, offsets = load_export(directory)
+    engine = engine or ValenceEngine(model_name=manifest["model_name"])
+    if manifest["labels"] != engine.emotion_labels:
+        raise ValueError("Export was made with a different set of emotion anchors; export again")
+
+    winners = winning_rows(similarity, offsets)
+    expected = manifest.get("expected")
+    # Test-case-only exports report distributions over the test cases
+    n_corpus = manifest["corpus_entries"] or manifest["n_entries"]
+    grid = replay_grid(engine, winners, guardrails, scores, angulars, expected, n_corpus)
+    return {
+        "export": directory,
+        "model_name": manifest["model_name"],
+        "entries": n_corpus,
+        "test_cases": sum(1 for e in expected or [] if e),
+        "current": {
+            "guardrail": engine.guardrail_threshold,
+            "score": engine.score_threshold,
+            "angular": engine.angular_threshold,
+        },
+        "grid": grid,
+    }
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def parse_grid(spec: str) -> np.ndarray:
+    """"0.1:0.4:0.05" (start:stop:step, stop included) or "0.2,0.22,0.25"."""
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(v) for v in spec.split(",")])
+
+
+def print_report(report: dict, top: int = 10) -> None:
+    grid = report["grid"]
+    current = report["current"]
+    has_tests = any("test_agreement" in row for row in grid)
+    print(f"Export:   {report['export']} ({report['entries']} entries, {report['test_cases']} test cases)")
+    print(f"Grid:     {len(grid)} threshold combinations")
+
+    def line(row):
+        tests = f"  tests {row['test_agreement']:6.1%}" if has_tests else ""
+        top_labels = ", ".join(f"{k} {v}" for k, v in list(row["labels"].items())[:3])
+        return (f"  guardrail {row['guardrail']:.2f}  score {row['score']:.2f}  angular {row['angular']:3.0f}"
+                f"{tests}  neutral {row['neutral_share']:6.1%}  blend {row['blend_rate']:6.1%}"
+                f"  changed {row['label_change_rate']:6.1%}  [{top_labels}]")
+
+    for row in grid:
+        if (row["guardrail"], row["score"], row["angular"]) == (current["guardrail"], current["score"], current["angular"]):
+            print("Current thresholds:")
+            print(line(row))
+    ranked = sorted(grid, key=lambda r: (-r.get("test_agreement", 0.0), r["label_change_rate"]))
+    print(f"Top {min(top, len(ranked))} by test agreement, then fewest label changes:")
+    for row in ranked[:top]:
+        print(line(row))
+
+
+def main(argv: list[str] | None = None) -> int:
+    from backend_drift import load_corpus
+    from corpus import TEST_CASES
+
+    parser = argparse.ArgumentParser(description="Encode a corpus once, then replay threshold grids offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Encode a corpus and save its similarity matrix")
+    export.add_argument("--corpus", help="CSV (Journal column) or text file, one entry per line (default: corpus.py test cases only)")
+    export.add_argument("--output", required=True, help="Export directory")
+    export.add_argument("--model", default=MODEL_NAME, help="sentence-transformers model name or path")
+    export.add_argument("--backend", default="fp32", choices=ENCODER_BACKENDS, help="Encoder backend")
+    export.add_argument("--dtype", default="float32", choices=SIMILARITY_DTYPES, help="Similarity storage type")
+    export.add_argument("--embeddings", action="store_true", help="Also save float16 sentence embeddings")
+
+    replay = sub.add_parser("replay", help="Replay a threshold grid over an export")
+    replay.add_argument("export", help="Export directory")
+    replay.add_argument("--guardrail", help=f"Grid, e.g. 0.1:0.4:0.02 or 0.2,0.22 (default around {GUARDRAIL_THRESHOLD})")
+    replay.add_argument("--score", help=f"Grid (default around {SCORE_THRESHOLD})")
+    replay.add_argument("--angular", help=f"Grid in degrees (default around {ANGULAR_THRESHOLD})")
+    replay.add_argument("--top", type=int, default=10, help="Grid points listed")
+    replay.add_argument("--json", help="Also write the full report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        engine = ValenceEngine(model_name=args.model, backend=args.backend, result_cache_size=0, persistent_cache=None)
+        corpus = load_corpus(args.corpus) if args.corpus else []
+        texts = corpus + [case["text"] for case in TEST_CASES]
+        expected = [None] * len(corpus) + [expected_labels(case["expected"], engine.emotion_labels) for case in TEST_CASES]
+        manifest = export_similarities(engine, texts, args.output, expected, len(corpus), args.dtype, args.embeddings)
+        print(f"Export saved to: {args.output} ({manifest['n_sentences']} sentences)")
+        return 0
+
+    report = replay_export(
+        args.export,
+        parse_grid(args.guardrail) if args.guardrail else GUARDRAIL_GRID,
+        parse_grid(args.score) if args.score else SCORE_GRID,
+        parse_grid(args.angular) if args.angular else ANGULAR_GRID,
+    )
+    print_report(report, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Emotion Trajectory Analytics for The Polar Emotion Compass
+===========================================================
+Rolling mood trends over many logged entries, computed on NumPy arrays of
+(radius, angle, timestamp) instead of row by row.
+
+Key Features:
+- Vectorised `to_cartesian`, `to_polar` and `angular_distance` (array
+  versions of the scalar helpers in `valence_engine`)
+- Trailing-window aggregates for every entry via cumulative sums:
+  Cartesian-mean direction, resultant strength, average intensity,
+  volatility (mean step between consecutive entries) and sector dwell time
+- `TrajectoryTracker`: the same aggregates updated in O(1) amortised time
+  as each new entry arrives, without recomputing history
+
+Neutral entries (radius 0) count towards intensity but pull the mean
+vector towards the centre; their dwell time is reported separately.
+"""
+
+from collections import deque
+
+import numpy as np
+
+DAY = 86_400.0
+WEEK = 7 * DAY
+MAX_DWELL_GAP = DAY  # An entry "holds" its sector until the next entry, at most this long
+
+# Wheel sectors, 60° wide and centred on 0°, 60°, ... (see the wheel's axis labels)
+SECTOR_NAMES = ("Joy", "Anger", "Fear", "Sad", "Bad", "Peaceful")
+NEUTRAL_SECTOR = len(SECTOR_NAMES)  # Extra dwell bucket for Neutral entries
+
+
+# ----------------------------------------------------------------------
+# Vectorised conversions
+# ----------------------------------------------------------------------
+
+def to_cartesian(radius, angle_degrees) -> tuple[np.ndarray, np.ndarray]:
+    """Array version of `polar_to_cartesian`."""
+    angle_radians = np.radians(angle_degrees)
+    return radius * np.cos(angle_radians), radius * np.sin(angle_radians)
+
+
+def to_polar(x, y) -> tuple[np.ndarray, np.ndarray]:
+    """Array version of `cartesian_to_polar` (angles normalised to 0-360)."""
+    radius = np.hypot(x, y)
+    angle_degrees = np.degrees(np.arctan2(y, x))
+    return radius, np.where(angle_degrees < 0, angle_degrees + 360, angle_degrees)
+
+
+def angular_distance(angle1, angle2) -> np.ndarray:
+    """Array version of `calculate_angular_distance` (0-180 degrees)."""
+    diff = np.abs(np.asarray(angle1) - np.asarray(angle2))
+    return np.where(diff > 180, 360 - diff, diff)
+
+
+def sector_index(radius, angle_degrees) -> np.ndarray:
+    """Wheel sector of each entry (0-5, NEUTRAL_SECTOR for radius 0)."""
+    sectors = (np.floor((np.asarray(angle_degrees) + 30) % 360 / 60)).astype(np.int64)
+    return np.where(np.asarray(radius) > 0, sectors, NEUTRAL_SECTOR)
+
+
+def _summary(count, sum_x, sum_y, sum_r, sum_steps, dwell) -> dict:
+    """Aggregates from window sums (scalars or arrays)."""
+    count = np.asarray(count)
+    entries = np.maximum(count, 1)
+    mean_x = np.where(count > 0, sum_x / entries, 0.0)
+    mean_y = np.where(count > 0, sum_y / entries, 0.0)
+    intensity = np.where(count > 0, sum_r / entries, 0.0)
+    volatility = np.where(count > 1, sum_steps / np.maximum(count - 1, 1), 0.0)
+    resultant, direction = to_polar(mean_x, mean_y)
+    return {
+        "count": count,
+        "mean_x": mean_x,
+        "mean_y": mean_y,
+        "direction": direction,      # Angle of the Cartesian mean (degrees)
+        "resultant": resultant,      # Length of the Cartesian mean: 0 = scattered, 1 = strong & consistent
+        "intensity": intensity,      # Mean radius
+        "volatility": volatility,    # Mean distance between consecutive entries
+        "dwell": dwell,              # Seconds per sector (last column: Neutral)
+    }
+
+
+# ----------------------------------------------------------------------
+# Batch: trailing window at every entry
+# ----------------------------------------------------------------------
+
+def rolling_trends(
+    radius,
+    angle_degrees,
+    timestamps,
+    window_seconds: float = WEEK,
+    max_gap: float = MAX_DWELL_GAP,
+) -> dict:
+    """
+    Aggregates over the trailing window ending at each entry.
+
+    Each entry's window holds every entry with timestamp in
+    [t - window_seconds, t]. Everything is computed from cumulative sums,
+    so the cost is O(n log n) for n entries whatever the window length.
+
+    Args:
+        radius, angle_degrees, timestamps: Equal-length arrays (timestamps in
+            seconds, e.g. `JournalStore.query(...)["ts"]`); sorted by time here
+        window_seconds: Window length (DAY, WEEK, ...)
+        max_gap: Longest time an entry counts as dwelling in its sector
+
+    Returns:
+        Dict of arrays (one value per entry, in time order) plus "ts";
+        "dwell" has shape (n, len(SECTOR_NAMES) + 1)
+    """
+    order = np.argsort(timestamps, kind="stable")
+    ts = np.asarray(timestamps, dtype=np.float64)[order]
+    r = np.asarray(radius, dtype=np.float64)[order]
+    a = np.asarray(angle_degrees, dtype=np.float64)[order]
+    n = ts.size
+
+    x, y = to_cartesian(r, a)
+    steps = np.zeros(n)
+    steps[1:] = np.hypot(np.diff(x), np.diff(y))  # steps[i]: entry i-1 -> i
+    dwell_each = np.zeros(n)
+    dwell_each[:-1] = np.minimum(np.diff(ts), max_gap)  # Last entry has no successor yet
+    dwell_onehot = np.zeros((n, NEUTRAL_SECTOR + 1))
+    dwell_onehot[np.arange(n), sector_index(r, a)] = dwell_each
+
+    def prefix(values):
+        return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+    cx, cy, cr, cs, cd = prefix(x), prefix(y), prefix(r), prefix(steps), prefix(dwell_onehot)
+
+    end = np.arange(1, n + 1)  # Window is entries [start, end)
+    start = np.searchsorted(ts, ts - window_seconds, side="left")
+    count = end - start
+
+    # Steps and dwell that stay inside the window: steps after `start`,
+    # dwell of every entry except the window's last
+    sum_steps = cs[end] - cs[np.minimum(start + 1, end)]
+    dwell = cd[end - 1] - cd[np.minimum(start, end - 1)]
+
+    result = _summary(count, cx[end] - cx[start], cy[end] - cy[start], cr[end] - cr[start], sum_steps, dwell)
+    result["ts"] = ts
+    return result
+
+
+# ----------------------------------------------------------------------
+# Incremental: one window, updated per new entry
+# ----------------------------------------------------------------------
+
+class TrajectoryTracker:
+    """
+    Trailing-window aggregates maintained as entries arrive.
+
+    Each `add()` costs O(1) amortised: window sums are updated for the new
+    entry and for entries that fall out of the window, never recomputed.
+
+    Args:
+        window_seconds: Window length (DAY, WEEK, ...)
+        max_gap: Longest time an entry counts as dwelling in its sector
+    """
+
+    def __init__(self, window_seconds: float = WEEK, max_gap: float = MAX_DWELL_GAP):
+        self.window_seconds = window_seconds
+        self.max_gap = max_gap
+        # Per entry: [ts, x, y, r, sector, dwell, step_from_previous]
+        self._entries = deque()
+        self._sum_x = self._sum_y = self._sum_r = self._sum_steps = 0.0
+        self._dwell = np.zeros(NEUTRAL_SECTOR + 1)
+
+    def add(self, radius: float, angle_degrees: float, timestamp: float) -> dict:
+        """
+        Add one entry (timestamps must not decrease) and return the aggregates.
+
+        Returns:
+            Same keys as `rolling_trends`, as scalars for the current window
+        """
+        x, y = (float(v) for v in to_cartesian(radius, angle_degrees))
+        sector = int(sector_index(radius, angle_degrees))
+
+        step = 0.0
+        if self._entries:
+            last = self._entries[-1]
+            if timestamp < last[0]:
+                raise ValueError("TrajectoryTracker entries must arrive in time order")
+            # The previous entry's dwell ends now
+            last[5] = min(timestamp - last[0], self.max_gap)
+            self._dwell[last[4]] += last[5]
+            step = float(np.hypot(x - last[1], y - last[2]))
+            self._sum_steps += step
+
+        self._entries.append([timestamp, x, y, float(radius), sector, 0.0, step])
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_r += float(radius)
+
+        # Evict entries that fell out of the window
+        cutoff = timestamp - self.window_seconds
+        while self._entries[0][0] < cutoff:
+            old = self._entries.popleft()
+            self._sum_x -= old[1]
+            self._sum_y -= old[2]
+            self._sum_r -= old[3]
+            self._dwell[old[4]] -= old[5]
+            first = self._entries[0]
+            self._sum_steps -= first[6]  # Its step came from the evicted entry
+            first[6] = 0.0
+
+        return self.current()
+
+    def current(self) -> dict:
+        """Aggregates for the current window."""
+        return _summary(
+            len(self._entries), self._sum_x, self._sum_y, self._sum_r, self._sum_steps, self._dwell.copy()
+        )
@@ -5,30 +5,81 @@ Sentence-based NLP with Top-2 Scalar Blending and Angular Guardrail.
 
 Key Features:
 - Sentence chunking for granular analysis
+- Batched sentence encoding + single matmul against unit-length anchors
+- Token-budget chunking: short fragments merged, run-on sentences split
+  instead of truncated, padding-minimising batch packing
 - Local sentence-transformers model (all-MiniLM-L6-v2)
 - Top-2 emotion blending with ANGULAR GUARDRAIL (60° max)
 - Prevents "Semantic Whiplash" (e.g., blending Happy + Sad)
 - SCALAR radius averaging + CARTESIAN angle interpolation
 - Lower threshold (0.22) for sensitivity
+- Lazy `ValenceEngine`: the model loads on first use, not at import time
+- Bounded LRU caches for sentence embeddings and per-entry results
+- Optional per-stage profiling (split / encode / similarity / blend)
+- `DraftScorer`: re-scores an edited draft, encoding only changed sentences
+- Optional lexical fast path for entries that name a single emotion outright
+- Optional exemplar anchor bank (many phrases per emotion, pooled scores)
+- Optional disk-backed result cache shared across restarts and processes
+- `warm_up()` + `is_ready`: run representative batch shapes before the
+  first real entry, so first-call latency matches later calls
 """
 
 import numpy as np
+import hashlib
 import math
+import os
 import re
-from sentence_transformers import SentenceTransformer, util
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
 from emotion_map import EMOTION_MAP
+import anchor_cache
+from anchor_index import ExemplarIndex, load_exemplar_index
+from chunking import ENCODE_BATCH_TOKENS, MIN_CHUNK_TOKENS, TokenChunker, pack_batches
+from lexicon import LexicalMatcher
+from profiling import EngineProfiler
+from result_store import PersistentResultCache, engine_fingerprint
+from trajectory import angular_distance, to_cartesian, to_polar
 
-# Global model cache - loaded once at import time
-print("Loading sentence transformer model...")
-MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-print("Model loaded successfully!")
+# Default model and engine parameters
+MODEL_NAME = 'all-MiniLM-L6-v2'
+GUARDRAIL_THRESHOLD = 0.22   # Minimum peak similarity, else Neutral
+SCORE_THRESHOLD = 0.75       # score2 must exceed score1 * this to blend
+ANGULAR_THRESHOLD = 60       # Max angular distance (degrees) to blend
+ENCODE_BATCH_SIZE = 64       # Sentences per encoder forward pass
 
-# Pre-encode emotion anchors as lowercase text
+# Encoder backends: fp32 (reference), int8 (dynamic quantisation of Linear
+# layers, faster on CPU) and fp16 (half-precision weights, half the memory)
+ENCODER_BACKENDS = ("fp32", "int8", "fp16")
+
+# In-memory LRU caches (0 disables a cache)
+EMBEDDING_CACHE_SIZE = 10_000               # Max cached sentence embeddings
+EMBEDDING_CACHE_BYTES = 64 * 1024 * 1024    # Max bytes held by those embeddings
+RESULT_CACHE_SIZE = 10_000                  # Max cached (radius, angle, emotion) results
+
+# Disk-backed result cache shared across restarts (unset: off)
+DEFAULT_RESULT_CACHE = os.environ.get("VALENCE_RESULT_CACHE") or None
+
+# Lexical fast path: every Nth fast-path hit is also scored by the model to
+# track how often the two disagree (0 disables the shadow check)
+FAST_PATH_VERIFY_EVERY = 20
+
+# Warm-up batch shapes: (entries, sentences per entry, words per sentence).
+# Covers a single short entry, typical journal entries, a server
+# micro-batch and one sentence long enough to hit the sequence limit.
+WARMUP_SHAPES = ((1, 1, 6), (1, 3, 14), (8, 3, 20), (64, 2, 12), (1, 1, 300))
+WARMUP_ROUNDS = 2  # The first round pays kernel / thread-pool start-up; later rounds confirm it is gone
+
+# On-disk anchor embedding cache (override with VALENCE_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VALENCE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".valence_cache"),
+)
+
+# Emotion anchors as lowercase text (encoded lazily by the engine)
 EMOTION_LABELS = list(EMOTION_MAP.keys())
 EMOTION_ANCHORS = [emotion.lower() for emotion in EMOTION_LABELS]
-ANCHOR_EMBEDDINGS = MODEL.encode(EMOTION_ANCHORS, convert_to_tensor=False)
-
-print(f"Pre-encoded {len(EMOTION_LABELS)} emotion anchors.")
 
 
 def polar_to_cartesian(radius: float, angle_degrees: float) -> tuple[float, float]:
@@ -44,22 +95,22 @@ def cartesian_to_polar(x: float, y: float) -> tuple[float, float]:
     radius = math.sqrt(x**2 + y**2)
     angle_radians = math.atan2(y, x)
     angle_degrees = math.degrees(angle_radians)
-    
+
     # Normalize angle to 0-360 range
     if angle_degrees < 0:
         angle_degrees += 360
-    
+
     return radius, angle_degrees
 
 
 def calculate_angular_distance(angle1: float, angle2: float) -> float:
     """
     Calculate shortest angular distance between two angles (0-180 degrees).
-    
+
     Args:
         angle1: First angle in degrees (0-360)
         angle2: Second angle in degrees (0-360)
-    
+
     Returns:
         Shortest distance in degrees (0-180)
     """
@@ -69,115 +120,1108 @@ def calculate_angular_distance(angle1: float, angle2: float) -> float:
     return diff
 
 
-def calculate_polar_coordinates(user_text: str) -> tuple[float, float, str]:
+SENTENCE_BOUNDARY = re.compile(r'[.!?\n]+')
+
+
+def split_sentences(user_text: str) -> list[str]:
+    """Split text on sentence punctuation/newlines, dropping empty chunks."""
+    sentences = SENTENCE_BOUNDARY.split(user_text)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def top2_indices(scores: np.ndarray) -> tuple[int, int]:
+    """Indices of the two highest scores, strongest first."""
+    candidates = np.argpartition(scores, -2)[-2:]
+    if scores[candidates[1]] >= scores[candidates[0]]:
+        candidates = candidates[::-1]
+    return int(candidates[0]), int(candidates[1])
+
+
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
     """
-    Calculate polar coordinates using Top-2 Scalar Blending with Angular Guardrail.
-    
-    Algorithm:
-    1. Split text into sentences
-    2. Find sentence with highest peak similarity
-    3. Guardrail: if max_score < 0.22, return Neutral
-    4. Get top 2 emotions from winning sentence
-    5. Calculate angular distance between them
-    6. BLEND if: score2 > (score1 * 0.75) AND angle_diff <= 60°
-       - SCALAR averaging for radius
-       - CARTESIAN interpolation for angle
-    7. SNAP if: conflicting emotions or clear winner
-    8. Return (radius, angle, closest_emotion)
-    
+    Collapse whitespace runs so cosmetic spacing changes share a cache key.
+
+    A run containing a newline becomes a single newline, since newlines are
+    sentence boundaries ("A\nB" and "A B" split, and score, differently).
+    """
+    return _WHITESPACE_RUN.sub(lambda m: "\n" if "\n" in m.group() else " ", text.strip())
+
+
+def text_key(text: str) -> str:
+    """Stable cache key for a (normalised) piece of text."""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _embedding_dimension(model) -> int:
+    """Embedding size of a SentenceTransformer (method was renamed in newer releases)."""
+    getter = getattr(model, "get_embedding_dimension", None) or model.get_sentence_embedding_dimension
+    return getter()
+
+
+def _apply_backend(model, backend: str):
+    """Convert a freshly loaded fp32 SentenceTransformer to the requested backend."""
+    if backend == "fp32":
+        return model
+
+    import torch
+
+    if backend == "int8":
+        # Dynamic quantisation: int8 weights, activations quantised on the fly
+        quantization = getattr(torch, "ao", torch).quantization
+        return quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model.half()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and (optionally) total bytes.
+
     Args:
-        user_text: The journal entry text
-    
-    Returns:
-        Tuple of (radius, angle_degrees, closest_emotion_name)
+        max_entries: Maximum number of cached items (0 disables the cache)
+        max_bytes: Maximum summed `sizeof(value)`, or None for no byte limit
+        sizeof: Function returning the memory footprint of a value in bytes
     """
-    if not user_text or not user_text.strip():
-        return 0.0, 0, "Neutral"
-    
-    # Step 1: Sentence Chunking
-    sentences = re.split(r'[.!?\n]+', user_text)
-    valid_sentences = [s.strip() for s in sentences if s.strip()]
-    
-    # Step 2: Guardrail - Check if we have valid sentences
-    if not valid_sentences:
-        return 0.0, 0, "Neutral"
-    
-    # Step 3: Find the "Winning Sentence"
-    best_global_score = 0.0
-    best_scores_array = None
-    
-    for sentence in valid_sentences:
-        # Encode the sentence
-        sentence_embedding = MODEL.encode(sentence, convert_to_tensor=False)
-        
-        # Calculate cosine similarities
-        similarities = np.dot(ANCHOR_EMBEDDINGS, sentence_embedding) / (
-            np.linalg.norm(ANCHOR_EMBEDDINGS, axis=1) * np.linalg.norm(sentence_embedding)
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value (marking it recently used), or None."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        """Insert or refresh a value, evicting least-recently-used items as needed."""
+        if self.max_entries <= 0:
+            return
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= self.sizeof(old)
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= self.sizeof(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached value (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ValenceEngine:
+    """
+    Owns the sentence-transformer model, emotion anchors and thresholds.
+
+    Nothing heavy happens in the constructor: the model is loaded and the
+    anchors are encoded on first use, so importing this module (or building
+    an engine that is never used) stays cheap.
+
+    Args:
+        model_name: sentence-transformers model name or local path
+        emotion_map: Emotion -> {radius, angle, ...} mapping to score against
+        guardrail_threshold: Minimum peak similarity, else Neutral
+        score_threshold: score2 must exceed score1 * this to blend
+        angular_threshold: Max angular distance (degrees) to blend
+        batch_size: Sentences per encoder forward pass
+        min_chunk_tokens: Sentences with fewer tokens are merged into a neighbour (0 disables)
+        batch_tokens: Max padded tokens per encoder forward pass
+        cache_dir: Directory for the memory-mapped anchor cache (None disables it)
+        backend: Encoder backend, one of ENCODER_BACKENDS
+        embedding_cache_size: Max sentence embeddings kept in the LRU cache
+        embedding_cache_bytes: Max bytes of sentence embeddings kept in the LRU cache
+        result_cache_size: Max per-entry results kept in the LRU cache
+        profile: Record per-stage timings (default from VALENCE_PROFILE=1)
+        fast_path: Answer entries that name a single emotion outright from
+            EMOTION_MAP, skipping the model (see `lexicon.LexicalMatcher`)
+        fast_path_verify_every: Shadow-score every Nth fast-path hit with the model
+        exemplar_index: Score against an exemplar bank (`anchor_index.ExemplarIndex`
+            or a directory saved by it) instead of the single-word anchors
+        persistent_cache: Disk-backed result cache (`result_store.PersistentResultCache`
+            or an SQLite path), checked after the in-memory one and before encoding
+    """
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        emotion_map: dict = EMOTION_MAP,
+        guardrail_threshold: float = GUARDRAIL_THRESHOLD,
+        score_threshold: float = SCORE_THRESHOLD,
+        angular_threshold: float = ANGULAR_THRESHOLD,
+        batch_size: int = ENCODE_BATCH_SIZE,
+        min_chunk_tokens: int = MIN_CHUNK_TOKENS,
+        batch_tokens: int = ENCODE_BATCH_TOKENS,
+        cache_dir: str | None = DEFAULT_CACHE_DIR,
+        backend: str = "fp32",
+        embedding_cache_size: int = EMBEDDING_CACHE_SIZE,
+        embedding_cache_bytes: int | None = EMBEDDING_CACHE_BYTES,
+        result_cache_size: int = RESULT_CACHE_SIZE,
+        profile: bool | None = None,
+        fast_path: bool = False,
+        fast_path_verify_every: int = FAST_PATH_VERIFY_EVERY,
+        exemplar_index: ExemplarIndex | str | None = None,
+        persistent_cache: PersistentResultCache | str | None = DEFAULT_RESULT_CACHE,
+    ):
+        self.model_name = model_name
+        self.emotion_map = emotion_map
+        self.guardrail_threshold = guardrail_threshold
+        self.score_threshold = score_threshold
+        self.angular_threshold = angular_threshold
+        self.batch_size = batch_size
+        self.min_chunk_tokens = min_chunk_tokens
+        self.batch_tokens = batch_tokens
+        self.cache_dir = cache_dir
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder backend {backend!r}; expected one of {ENCODER_BACKENDS}")
+        self.backend = backend
+
+        self.emotion_labels = list(emotion_map.keys())
+        self.emotion_anchors = [emotion.lower() for emotion in self.emotion_labels]
+
+        # Per-anchor polar data, aligned with emotion_labels for vectorised blending
+        self.anchor_radii = np.array([emotion_map[e]["radius"] for e in self.emotion_labels], dtype=np.float64)
+        self.anchor_angles = np.array([emotion_map[e]["angle"] for e in self.emotion_labels], dtype=np.float64)
+
+        self._model = None
+        self._chunker = None
+        self._anchor_embeddings = None
+        self._anchor_unit_embeddings = None
+        self._load_lock = threading.Lock()
+        self._ready = threading.Event()  # Set by warm_up()
+
+        # Sentence embeddings depend only on the model; results also depend on
+        # EMOTION_MAP and thresholds, so call invalidate_caches() if those change
+        self.embedding_cache = LRUCache(
+            embedding_cache_size, embedding_cache_bytes, sizeof=lambda emb: emb.nbytes
+        )
+        self.result_cache = LRUCache(result_cache_size)
+
+        # Per-stage timings; near-zero overhead while profiler.enabled is False
+        self.profiler = EngineProfiler(enabled=profile)
+
+        self.lexicon = LexicalMatcher(emotion_map) if fast_path else None
+        self.fast_path_verify_every = fast_path_verify_every
+        self._fast_path_lock = threading.Lock()
+        self._fast_path_counts = {"entries": 0, "fast_path": 0, "verified": 0, "disagreements": 0}
+
+        self.exemplar_index = exemplar_index
+        # Directory the bank came from; load() replaces exemplar_index with the loaded object
+        self.exemplar_path = exemplar_index if isinstance(exemplar_index, str) else None
+        self._exemplar_columns = None  # engine label -> index column (-1 if absent)
+
+        if isinstance(persistent_cache, str):
+            persistent_cache = PersistentResultCache(persistent_cache)
+        self.persistent_cache = persistent_cache
+        self._fingerprint = None  # Computed on first persistent lookup
+
+    # ------------------------------------------------------------------
+    # Lazy resources
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the model and anchor embeddings are in memory."""
+        return self._anchor_unit_embeddings is not None
+
+    def load(
+        self,
+        anchor_embeddings: np.ndarray | None = None,
+        anchor_unit_embeddings: np.ndarray | None = None,
+    ) -> "ValenceEngine":
+        """
+        Load the model and encode the anchors (no-op if already loaded).
+
+        Args:
+            anchor_embeddings: Precomputed anchors (e.g. a shared-memory view
+                from a parent process); skips the anchor cache and encoding
+            anchor_unit_embeddings: Matching L2-normalised anchors, used as-is
+                so the engine holds no private copy
+        """
+        if self.is_loaded:
+            return self
+        with self._load_lock:
+            if self.is_loaded:
+                return self
+
+            # Deferred import: pulls in torch, which is slow to import
+            from sentence_transformers import SentenceTransformer
+
+            print("Loading sentence transformer model...")
+            model = _apply_backend(SentenceTransformer(self.model_name), self.backend)
+            print(f"Model loaded successfully! ({self.backend})")
+
+            if anchor_embeddings is None:
+                anchor_embeddings = self._load_anchor_embeddings(model)
+            if anchor_unit_embeddings is None:
+                # Unit-length anchors so cosine similarity becomes a single matrix multiply
+                anchor_unit_embeddings = anchor_embeddings / np.linalg.norm(
+                    anchor_embeddings, axis=1, keepdims=True
+                )
+
+            self._model = model
+            # Content budget: the encoder adds [CLS] and [SEP] to every chunk
+            self._chunker = TokenChunker(
+                model.tokenizer, split_sentences, model.max_seq_length - 2, self.min_chunk_tokens
+            )
+            if self.exemplar_index is not None:
+                if isinstance(self.exemplar_index, str):
+                    self.exemplar_index = load_exemplar_index(self.exemplar_index, self.model_name)
+                self._exemplar_columns = self.exemplar_index.aligned_to(self.emotion_labels)
+                print(f"Exemplar index: {len(self.exemplar_index)} exemplars ({self.exemplar_index.pooling} pooling).")
+
+            self._anchor_embeddings = anchor_embeddings
+            self._anchor_unit_embeddings = anchor_unit_embeddings
+        return self
+
+    @property
+    def is_ready(self) -> bool:
+        """True once `warm_up()` has finished: the first real entry will not pay start-up costs."""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until `warm_up()` finishes (or `timeout` seconds pass). Returns `is_ready`."""
+        return self._ready.wait(timeout)
+
+    def warm_up(self, shapes: Iterable[tuple[int, int, int]] = WARMUP_SHAPES, rounds: int = WARMUP_ROUNDS) -> dict:
+        """
+        Load the model and run synthetic entries of representative batch shapes.
+
+        The first forward passes initialise torch kernels and thread pools;
+        doing that here keeps it off the first patient's entry. Warm-up
+        texts go through chunking, encoding, similarity and blending but
+        bypass the LRU caches and the profiler, then the engine is marked ready.
+
+        Args:
+            shapes: (entries, sentences per entry, words per sentence) tuples
+            rounds: Passes over all shapes
+
+        Returns:
+            Dict of shape -> milliseconds in the last round
+        """
+        self.load()
+        words = self.emotion_anchors
+        timings = {}
+        start_all = time.perf_counter()
+        for _ in range(max(1, rounds)):
+            for shape in shapes:
+                entries, sentences, length = shape
+                texts = [
+                    ". ".join(
+                        " ".join(words[(e + s + w) % len(words)] for w in range(length))
+                        for s in range(sentences)
+                    )
+                    for e in range(entries)
+                ]
+                start = time.perf_counter()
+                chunks = [c for entry_chunks in self.chunk_texts(texts) for c in entry_chunks]
+                self.blend_top2_batch(self.cosine_similarity_matrix(self.encode_sentences(chunks)))
+                timings[tuple(shape)] = (time.perf_counter() - start) * 1000
+        self._ready.set()
+        print(f"Engine warmed up in {(time.perf_counter() - start_all) * 1000:.0f} ms ({len(timings)} batch shapes).")
+        return timings
+
+    @property
+    def _anchor_cache_key(self) -> str:
+        """Anchor cache identity: anchors differ between encoder backends."""
+        if self.backend == "fp32":
+            return self.model_name
+        return f"{self.model_name}[{self.backend}]"
+
+    def _load_anchor_embeddings(self, model) -> np.ndarray:
+        """Memory-map cached anchors, or encode them and refresh the cache."""
+        if self.cache_dir:
+            cached = anchor_cache.load_anchor_embeddings(
+                self.cache_dir,
+                self._anchor_cache_key,
+                self.emotion_anchors,
+                _embedding_dimension(model),
+            )
+            if cached is not None:
+                print(f"Loaded {len(self.emotion_labels)} emotion anchors from cache.")
+                return cached
+
+        anchor_embeddings = np.asarray(
+            model.encode(self.emotion_anchors, convert_to_tensor=False), dtype=np.float32
+        )
+        print(f"Pre-encoded {len(self.emotion_labels)} emotion anchors.")
+
+        if self.cache_dir:
+            try:
+                anchor_cache.save_anchor_embeddings(
+                    self.cache_dir, self._anchor_cache_key, self.emotion_anchors, anchor_embeddings
+                )
+            except OSError as e:
+                print(f"Could not write anchor cache: {e}")
+        return anchor_embeddings
+
+    @property
+    def model(self):
+        """The SentenceTransformer model (loaded on first access)."""
+        return self.load()._model
+
+    @property
+    def chunker(self) -> TokenChunker:
+        self.load()
+        return self._chunker
+
+    @property
+    def anchor_embeddings(self) -> np.ndarray:
+        """Raw anchor embeddings, shape (n_anchors, dim)."""
+        return self.load()._anchor_embeddings
+
+    @property
+    def anchor_unit_embeddings(self) -> np.ndarray:
+        """L2-normalised anchor embeddings, shape (n_anchors, dim)."""
+        return self.load()._anchor_unit_embeddings
+
+    # ------------------------------------------------------------------
+    # Caches
+    # ------------------------------------------------------------------
+
+    def invalidate_caches(self, embeddings: bool = False) -> None:
+        """
+        Drop cached results after EMOTION_MAP or threshold changes.
+
+        Args:
+            embeddings: Also drop cached sentence embeddings (only needed if
+                the model itself changed)
+        """
+        self.result_cache.clear()
+        self._fingerprint = None  # Persistent rows of the old configuration are no longer matched
+        if embeddings:
+            self.embedding_cache.clear()
+
+    @property
+    def result_fingerprint(self) -> str:
+        """Hash of the model, EMOTION_MAP and scoring parameters (see `result_store.engine_fingerprint`)."""
+        if self._fingerprint is None:
+            self._fingerprint = engine_fingerprint(self)
+        return self._fingerprint
+
+    def _load_results(self, keys: list[str]) -> list[tuple[float, float, str] | None]:
+        """Persistent-cache results for text keys, copied into the in-memory cache."""
+        fingerprint = self.result_fingerprint
+        stored = self.persistent_cache.get_many([PersistentResultCache.key(fingerprint, k) for k in keys])
+        for key, result in zip(keys, stored):
+            if result is not None:
+                self.result_cache.put(key, result)
+        return stored
+
+    def _store_results(self, items: list[tuple[str, tuple[float, float, str]]]) -> None:
+        """Remember (text key, result) pairs in memory and, if enabled, on disk."""
+        for key, result in items:
+            self.result_cache.put(key, result)
+        if self.persistent_cache is not None:
+            fingerprint = self.result_fingerprint
+            self.persistent_cache.put_many(
+                [(PersistentResultCache.key(fingerprint, key), result) for key, result in items]
+            )
+
+    def _fast_path(self, user_text: str) -> tuple[tuple[float, float, str] | None, bool]:
+        """
+        Lexical result for an entry and whether to shadow-check it with the model.
+
+        Returns:
+            (result or None, verify)
+        """
+        result = self.lexicon.match(split_sentences(user_text))
+        with self._fast_path_lock:
+            counts = self._fast_path_counts
+            counts["entries"] += 1
+            if result is None:
+                return None, False
+            counts["fast_path"] += 1
+            verify = bool(self.fast_path_verify_every) and counts["fast_path"] % self.fast_path_verify_every == 0
+        return result, verify
+
+    def _record_verification(self, fast_label: str, model_label: str) -> None:
+        with self._fast_path_lock:
+            self._fast_path_counts["verified"] += 1
+            self._fast_path_counts["disagreements"] += int(fast_label != model_label)
+
+    def fast_path_stats(self) -> dict:
+        """Share of entries answered lexically and disagreement rate on shadow-checked ones."""
+        with self._fast_path_lock:
+            counts = dict(self._fast_path_counts)
+        counts["enabled"] = self.lexicon is not None
+        counts["fast_path_share"] = counts["fast_path"] / counts["entries"] if counts["entries"] else 0.0
+        counts["disagreement_rate"] = counts["disagreements"] / counts["verified"] if counts["verified"] else 0.0
+        return counts
+
+    def profiling_stats(self) -> dict:
+        """Rolling per-stage timing, sentence and token statistics."""
+        return self.profiler.stats()
+
+    def count_tokens(self, sentences: list[str]) -> int:
+        """Total tokenizer tokens (including special tokens) for `sentences`."""
+        if not sentences:
+            return 0
+        encoded = self.model.tokenizer(sentences, add_special_tokens=True, truncation=False)
+        return sum(len(ids) for ids in encoded["input_ids"])
+
+    def _finish_call(self, timer, sentences: list[str], **counts) -> None:
+        """Close a profiled call; token counting only happens when profiling."""
+        if timer.enabled:
+            timer.finish(sentences=len(sentences), tokens=self.count_tokens(sentences), **counts)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the embedding and result caches."""
+        stats = {
+            "embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
+        if self.persistent_cache is not None:
+            stats["persistent"] = self.persistent_cache.stats()
+        return stats
+
+    # ------------------------------------------------------------------
+    # Encoding and similarity
+    # ------------------------------------------------------------------
+
+    def chunk_texts(self, texts: list[str]) -> list[list[str]]:
+        """
+        Split journal texts into scoring chunks (see `chunking.TokenChunker`).
+
+        Texts with no sentences at all never touch the tokenizer, so blank
+        input does not load the model.
+
+        Args:
+            texts: Journal texts
+
+        Returns:
+            One list of chunks per text
+        """
+        fragments = [split_sentences(text) for text in texts]
+        if not any(fragments):
+            return fragments
+        return self.chunker.chunk_fragments(fragments)
+
+    def encode_sentences(self, sentences: list[str], batch_size: int | None = None) -> np.ndarray:
+        """
+        Encode sentences in padding-minimising batches.
+
+        Sentences are sorted by token length and packed so each forward pass
+        holds similar-length inputs under `batch_tokens` padded tokens, then
+        embeddings are restored to input order.
+
+        Args:
+            sentences: Sentences to encode
+            batch_size: Sentences per forward pass (defaults to the engine's)
+
+        Returns:
+            Array of shape (n_sentences, dim) in the same order as `sentences`
+        """
+        if not sentences:
+            return np.zeros((0, _embedding_dimension(self.model)), dtype=np.float32)
+        lengths = self.chunker.token_lengths(sentences)
+        embeddings = None
+        for batch in pack_batches(lengths, batch_size or self.batch_size, self.batch_tokens):
+            batch_embeddings = self.model.encode(
+                [sentences[i] for i in batch],
+                batch_size=len(batch),
+                convert_to_tensor=False,
+            )
+            if embeddings is None:
+                embeddings = np.empty((len(sentences), batch_embeddings.shape[1]), dtype=np.float32)
+            # fp16 backend returns float16; keep similarity math in float32
+            embeddings[batch] = batch_embeddings
+        return embeddings
+
+    def embed_sentences(self, sentences: list[str], batch_size: int | None = None) -> np.ndarray:
+        """
+        Embeddings for `sentences`, served from the LRU cache where possible.
+
+        Only distinct cache misses are sent to the encoder, in one batched call.
+
+        Args:
+            sentences: Sentences to embed
+            batch_size: Sentences per forward pass for the misses
+
+        Returns:
+            Array of shape (n_sentences, dim) in the same order as `sentences`
+        """
+        if not sentences:
+            return np.zeros((0, _embedding_dimension(self.model)), dtype=np.float32)
+        keys = [text_key(s) for s in sentences]
+        cached = [self.embedding_cache.get(k) for k in keys]
+
+        # Encode each distinct missing sentence once
+        missing = {}
+        for sentence, key, emb in zip(sentences, keys, cached):
+            if emb is None and key not in missing:
+                missing[key] = sentence
+        if missing:
+            new_embeddings = self.encode_sentences(list(missing.values()), batch_size)
+            # Own copies: a row view would keep the whole batch array alive
+            # while the cache counts only one row's bytes
+            encoded = {key: emb.copy() for key, emb in zip(missing.keys(), new_embeddings)}
+            for key, emb in encoded.items():
+                self.embedding_cache.put(key, emb)
+            cached = [emb if emb is not None else encoded[k] for k, emb in zip(keys, cached)]
+
+        return np.stack(cached)
+
+    def cosine_similarity_matrix(self, sentence_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of every sentence against every emotion anchor.
+
+        With an exemplar index, each emotion's score is instead pooled over
+        its exemplars; emotions without exemplars score -inf.
+
+        Args:
+            sentence_embeddings: Array of shape (n_sentences, dim)
+
+        Returns:
+            Array of shape (n_sentences, n_anchors)
+        """
+        if self.exemplar_index is not None:
+            self.load()
+            pooled = self.exemplar_index.scores(sentence_embeddings)
+            columns = self._exemplar_columns
+            scores = np.full((len(pooled), len(columns)), -np.inf, dtype=np.float32)
+            scores[:, columns >= 0] = pooled[:, columns[columns >= 0]]
+            return scores
+        norms = np.linalg.norm(sentence_embeddings, axis=1, keepdims=True)
+        return (sentence_embeddings / norms) @ self.anchor_unit_embeddings.T
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def calculate_polar_coordinates(self, user_text: str) -> tuple[float, float, str]:
+        """
+        Calculate polar coordinates using Top-2 Scalar Blending with Angular Guardrail.
+
+        Algorithm:
+        1. Split text into sentences
+        2. Find sentence with highest peak similarity
+        3. Guardrail: if max_score < 0.22, return Neutral
+        4. Get top 2 emotions from winning sentence
+        5. Calculate angular distance between them
+        6. BLEND if: score2 > (score1 * 0.75) AND angle_diff <= 60°
+           - SCALAR averaging for radius
+           - CARTESIAN interpolation for angle
+        7. SNAP if: conflicting emotions or clear winner
+        8. Return (radius, angle, closest_emotion)
+
+        Args:
+            user_text: The journal entry text
+
+        Returns:
+            Tuple of (radius, angle_degrees, closest_emotion_name)
+        """
+        if not user_text or not user_text.strip():
+            return 0.0, 0.0, "Neutral"
+
+        timer = self.profiler.start_call("single")
+        key = text_key(user_text)
+        cached = self.result_cache.get(key)
+        if cached is None and self.persistent_cache is not None:
+            cached = self._load_results([key])[0]
+        if cached is not None:
+            timer.finish(cache_hit=1)
+            return cached
+
+        if self.lexicon is not None:
+            result, verify = self._fast_path(user_text)
+            if result is not None:
+                if verify:
+                    self._record_verification(result[2], self._score_text(user_text, timer)[2])
+                else:
+                    timer.finish(fast_path=1)
+                self._store_results([(key, result)])
+                return result
+
+        result = self._score_text(user_text, timer)
+        self._store_results([(key, result)])
+        return result
+
+    def _score_text(self, user_text: str, timer) -> tuple[float, float, str]:
+        """Uncached body of `calculate_polar_coordinates`."""
+        # Step 1: Sentence Chunking (token-budget aware)
+        valid_sentences = self.chunk_texts([user_text])[0]
+        timer.mark("split")
+
+        # Step 2: Guardrail - Check if we have valid sentences
+        if not valid_sentences:
+            self._finish_call(timer, valid_sentences, cache_hit=0)
+            return 0.0, 0.0, "Neutral"
+
+        # Step 3: Find the "Winning Sentence" (one batched forward pass)
+        sentence_embeddings = self.embed_sentences(valid_sentences)
+        timer.mark("encode")
+        similarity_matrix = self.cosine_similarity_matrix(sentence_embeddings)
+
+        # Peak similarity per sentence; argmax keeps the first sentence on ties
+        sentence_max_scores = similarity_matrix.max(axis=1)
+        winning_idx = int(np.argmax(sentence_max_scores))
+        best_global_score = sentence_max_scores[winning_idx]
+        best_scores_array = similarity_matrix[winning_idx]
+        timer.mark("similarity")
+
+        # Step 4: Guardrail - Check threshold
+        if best_global_score < self.guardrail_threshold:
+            timer.mark("blend")
+            self._finish_call(timer, valid_sentences, cache_hit=0)
+            return 0.0, 0.0, "Neutral"
+
+        result = self.blend_winning_row(best_scores_array)
+        timer.mark("blend")
+        self._finish_call(timer, valid_sentences, cache_hit=0)
+        return result
+
+    def blend_winning_row(self, best_scores_array: np.ndarray) -> tuple[float, float, str]:
+        """
+        Steps 5-8 of `calculate_polar_coordinates` for one winning-sentence row.
+
+        The caller has already applied the guardrail threshold.
+
+        Args:
+            best_scores_array: Similarities of the winning sentence to every anchor
+
+        Returns:
+            Tuple of (radius, angle_degrees, closest_emotion_name)
+        """
+        # Step 5: Get Top-2 emotions from winning sentence
+        idx1, idx2 = top2_indices(best_scores_array)
+        score1, score2 = best_scores_array[idx1], best_scores_array[idx2]
+
+        emotion1_name = self.emotion_labels[idx1]
+        emotion2_name = self.emotion_labels[idx2]
+
+        emotion1_data = self.emotion_map[emotion1_name]
+        emotion2_data = self.emotion_map[emotion2_name]
+
+        # Step 6: Calculate angular distance
+        angle1 = emotion1_data["angle"]
+        angle2 = emotion2_data["angle"]
+        angle_diff = calculate_angular_distance(angle1, angle2)
+
+        # Step 7: Conditional Blending with ANGULAR GUARDRAIL
+        if score2 > (score1 * self.score_threshold) and angle_diff <= self.angular_threshold:
+            # BLEND: Emotions are close in both score AND angle
+            weight1 = score1 ** 2
+            weight2 = score2 ** 2
+            total_weight = weight1 + weight2
+
+            # SCALAR averaging for radius
+            r1 = emotion1_data["radius"]
+            r2 = emotion2_data["radius"]
+            final_radius = (r1 * weight1 + r2 * weight2) / total_weight
+
+            # CARTESIAN interpolation for angle
+            x1, y1 = polar_to_cartesian(1.0, angle1)
+            x2, y2 = polar_to_cartesian(1.0, angle2)
+
+            # Weighted average in Cartesian space
+            avg_x = (x1 * weight1 + x2 * weight2) / total_weight
+            avg_y = (y1 * weight1 + y2 * weight2) / total_weight
+
+            # Convert back to get final angle
+            _, final_angle = cartesian_to_polar(avg_x, avg_y)
+
+            closest_emotion = emotion1_name  # Primary emotion is still the strongest
+        else:
+            # SNAP: Conflicting emotions (far apart) or clear winner
+            final_radius = emotion1_data["radius"]
+            final_angle = emotion1_data["angle"]
+            closest_emotion = emotion1_name
+
+        # Step 8: Cap radius at 1.0 and return (plain floats, like the batch path's values)
+        final_radius = min(1.0, final_radius)
+        return float(final_radius), float(final_angle), closest_emotion
+
+    def blend_top2_batch(self, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorised Top-2 blending with Angular Guardrail over many winning rows.
+
+        Same rules as `calculate_polar_coordinates` steps 4-8, applied to every
+        row of `scores` at once.
+
+        Args:
+            scores: Array of shape (n_entries, n_anchors), one winning-sentence
+                similarity row per entry (NaN rows are treated as Neutral)
+
+        Returns:
+            Tuple of (radii, angles_degrees, labels) arrays of length n_entries
+        """
+        n_entries = scores.shape[0]
+        radii = np.zeros(n_entries, dtype=np.float64)
+        angles = np.zeros(n_entries, dtype=np.float64)
+        labels = np.full(n_entries, "Neutral", dtype=object)
+
+        # Guardrail - entries below threshold stay Neutral
+        peak = np.max(scores, axis=1)
+        active = np.flatnonzero(peak >= self.guardrail_threshold)
+        if active.size == 0:
+            return radii, angles, labels
+        top2 = self.top2_candidates(scores[active])
+
+        blend = (
+            (top2["score2"] > top2["score1"] * self.score_threshold)
+            & (top2["angle_diff"] <= self.angular_threshold)
         )
-        
-        # Find max score for this sentence
-        max_score = np.max(similarities)
-        
-        # Update winning sentence if this is better
-        if max_score > best_global_score:
-            best_global_score = max_score
-            best_scores_array = similarities
-    
-    # Step 4: Guardrail - Check threshold
-    GUARDRAIL_THRESHOLD = 0.22
-    if best_global_score < GUARDRAIL_THRESHOLD:
-        return 0.0, 0, "Neutral"
-    
-    # Step 5: Get Top-2 emotions from winning sentence
-    top2_indices = np.argsort(best_scores_array)[-2:][::-1]  # Get indices of top 2, descending
-    idx1, idx2 = top2_indices[0], top2_indices[1]
-    score1, score2 = best_scores_array[idx1], best_scores_array[idx2]
-    
-    emotion1_name = EMOTION_LABELS[idx1]
-    emotion2_name = EMOTION_LABELS[idx2]
-    
-    emotion1_data = EMOTION_MAP[emotion1_name]
-    emotion2_data = EMOTION_MAP[emotion2_name]
-    
-    # Step 6: Calculate angular distance
-    angle1 = emotion1_data["angle"]
-    angle2 = emotion2_data["angle"]
-    angle_diff = calculate_angular_distance(angle1, angle2)
-    
-    # Step 7: Conditional Blending with ANGULAR GUARDRAIL
-    SCORE_THRESHOLD = 0.75
-    ANGULAR_THRESHOLD = 60  # degrees
-    
-    if score2 > (score1 * SCORE_THRESHOLD) and angle_diff <= ANGULAR_THRESHOLD:
-        # BLEND: Emotions are close in both score AND angle
-        weight1 = score1 ** 2
-        weight2 = score2 ** 2
+        radii[active] = np.minimum(1.0, np.where(blend, top2["blended_radius"], top2["radius1"]))
+        angles[active] = np.where(blend, top2["blended_angle"], top2["angle1"])
+        labels[active] = np.asarray(self.emotion_labels, dtype=object)[top2["idx1"]]
+        return radii, angles, labels
+
+    def top2_candidates(self, scores: np.ndarray) -> dict:
+        """
+        Threshold-free part of Top-2 blending (steps 4-6) for many winning rows.
+
+        `blend_top2_batch` applies the score and angular thresholds to these
+        arrays; `threshold_tuning` applies whole grids of them.
+
+        Args:
+            scores: Array of shape (n_rows, n_anchors), no NaN rows
+
+        Returns:
+            Dict of arrays, one element per row: idx1 / idx2 (top-2 anchors,
+            strongest first), score1 / score2, radius1 / angle1 (the snapped
+            result), angle_diff, blended_radius / blended_angle (the result if
+            the two are blended)
+        """
+        # Top-2 per row, strongest first
+        rows = np.arange(scores.shape[0])
+        top2 = np.argpartition(scores, -2, axis=1)[:, -2:]
+        swap = scores[rows, top2[:, 1]] >= scores[rows, top2[:, 0]]
+        idx1 = np.where(swap, top2[:, 1], top2[:, 0])
+        idx2 = np.where(swap, top2[:, 0], top2[:, 1])
+        score1 = scores[rows, idx1].astype(np.float64)
+        score2 = scores[rows, idx2].astype(np.float64)
+
+        r1, r2 = self.anchor_radii[idx1], self.anchor_radii[idx2]
+        angle1, angle2 = self.anchor_angles[idx1], self.anchor_angles[idx2]
+
+        # SCALAR radius + CARTESIAN angle interpolation. Emotions an exemplar
+        # bank did not probe score -inf: they get no weight (never blended
+        # anyway) instead of inf / inf = NaN
+        weight1 = np.where(np.isfinite(score1), score1 ** 2, 0.0)
+        weight2 = np.where(np.isfinite(score2), score2 ** 2, 0.0)
         total_weight = weight1 + weight2
-        
-        # SCALAR averaging for radius
-        r1 = emotion1_data["radius"]
-        r2 = emotion2_data["radius"]
-        final_radius = (r1 * weight1 + r2 * weight2) / total_weight
-        
-        # CARTESIAN interpolation for angle
-        x1, y1 = polar_to_cartesian(1.0, angle1)
-        x2, y2 = polar_to_cartesian(1.0, angle2)
-        
-        # Weighted average in Cartesian space
-        avg_x = (x1 * weight1 + x2 * weight2) / total_weight
-        avg_y = (y1 * weight1 + y2 * weight2) / total_weight
-        
-        # Convert back to get final angle
-        _, final_angle = cartesian_to_polar(avg_x, avg_y)
-        
-        closest_emotion = emotion1_name  # Primary emotion is still the strongest
-    else:
-        # SNAP: Conflicting emotions (far apart) or clear winner
-        final_radius = emotion1_data["radius"]
-        final_angle = emotion1_data["angle"]
-        closest_emotion = emotion1_name
-    
-    # Step 8: Cap radius at 1.0 and return
-    final_radius = min(1.0, final_radius)
-    
-    return final_radius, final_angle, closest_emotion
\ No newline at end of file
+        total_weight[total_weight == 0] = 1.0  # Rows the guardrail turns Neutral
+        blended_radius = (r1 * weight1 + r2 * weight2) / total_weight
+
+        x1, y1 = to_cartesian(1.0, angle1)
+        x2, y2 = to_cartesian(1.0, angle2)
+        _, blended_angle = to_polar(
+            (x1 * weight1 + x2 * weight2) / total_weight,
+            (y1 * weight1 + y2 * weight2) / total_weight,
+        )
+        return {
+            "idx1": idx1,
+            "idx2": idx2,
+            "score1": score1,
+            "score2": score2,
+            "radius1": r1,
+            "angle1": angle1,
+            "angle_diff": angular_distance(angle1, angle2),  # Shortest angular distance (0-180)
+            "blended_radius": blended_radius,
+            "blended_angle": blended_angle,
+        }
+
+    def calculate_polar_coordinates_batch(
+        self,
+        texts: Iterable[str],
+        batch_size: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score many journal entries at once.
+
+        Sentences from every entry are flattened into one list, encoded in
+        length-bucketed batches and scored with a single similarity matmul.
+        Winning-sentence selection and Top-2 blending then run vectorised over
+        all entries. Results match `calculate_polar_coordinates` per entry.
+
+        Args:
+            texts: List or iterable of journal entry texts
+            batch_size: Sentences per encoder forward pass
+
+        Returns:
+            Tuple of (radii, angles_degrees, labels) NumPy arrays, one element
+            per input text, in input order. Radii and angles are float64
+            (elements are `float` subclasses, like the single-entry values)
+        """
+        timer = self.profiler.start_call("batch")
+        texts = list(texts)
+        n_entries = len(texts)
+        radii = np.zeros(n_entries, dtype=np.float64)
+        angles = np.zeros(n_entries, dtype=np.float64)
+        labels = np.full(n_entries, "Neutral", dtype=object)
+
+        # Serve repeated entries from the result caches (memory, then disk in
+        # one query), explicit ones lexically
+        misses = []
+        cache_hits = fast_path_hits = 0
+        for entry_idx, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            key = text_key(text)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                radii[entry_idx], angles[entry_idx], labels[entry_idx] = cached
+                cache_hits += 1
+            else:
+                misses.append((entry_idx, key))
+        if misses and self.persistent_cache is not None:
+            stored = self._load_results([key for _, key in misses])
+            for (entry_idx, _), cached in zip(misses, stored):
+                if cached is not None:
+                    radii[entry_idx], angles[entry_idx], labels[entry_idx] = cached
+                    cache_hits += 1
+            misses = [miss for miss, cached in zip(misses, stored) if cached is None]
+
+        pending = []
+        pending_keys = []
+        shadowed = {}  # entry_idx -> lexical result also scored by the model
+        fast_results = []
+        for entry_idx, key in misses:
+            if self.lexicon is not None:
+                result, verify = self._fast_path(texts[entry_idx])
+                if result is not None:
+                    fast_path_hits += 1
+                    if verify:
+                        shadowed[entry_idx] = result
+                    else:
+                        radii[entry_idx], angles[entry_idx], labels[entry_idx] = result
+                        fast_results.append((key, result))
+                        continue
+            pending.append(entry_idx)
+            pending_keys.append(key)
+        if fast_results:
+            self._store_results(fast_results)
+        if not pending:
+            timer.finish(entries=n_entries, cache_hits=cache_hits, fast_path=fast_path_hits)
+            return radii, angles, labels
+
+        # Step 1: Flatten sentences, remembering which entry each came from
+        all_sentences = []
+        entry_ids = []
+        chunks = self.chunk_texts([texts[entry_idx] for entry_idx in pending])
+        for slot, sentences in enumerate(chunks):
+            all_sentences.extend(sentences)
+            entry_ids.extend([slot] * len(sentences))
+
+        n_pending = len(pending)
+        timer.mark("split")
+        winning_scores = np.full((n_pending, len(self.emotion_labels)), np.nan, dtype=np.float32)
+        if all_sentences:
+            entry_ids = np.asarray(entry_ids)
+
+            # Step 2: One encoder pass + one similarity matmul for everything
+            sentence_embeddings = self.embed_sentences(all_sentences, batch_size)
+            timer.mark("encode")
+            similarity_matrix = self.cosine_similarity_matrix(sentence_embeddings)
+            sentence_max_scores = similarity_matrix.max(axis=1)
+
+            # Step 3: Winning sentence per entry (first sentence on ties)
+            entry_max = np.full(n_pending, -np.inf, dtype=sentence_max_scores.dtype)
+            np.maximum.at(entry_max, entry_ids, sentence_max_scores)
+            peak_sentences = np.flatnonzero(sentence_max_scores == entry_max[entry_ids])
+            winners_entry, first = np.unique(entry_ids[peak_sentences], return_index=True)
+            winning_scores[winners_entry] = similarity_matrix[peak_sentences[first]]
+            timer.mark("similarity")
+
+        # Step 4-8: Guardrail, Top-2 blend and polar conversion for all entries
+        with np.errstate(invalid="ignore"):
+            new_radii, new_angles, new_labels = self.blend_top2_batch(winning_scores)
+
+        radii[pending], angles[pending], labels[pending] = new_radii, new_angles, new_labels
+        for entry_idx, result in shadowed.items():
+            self._record_verification(result[2], labels[entry_idx])
+            radii[entry_idx], angles[entry_idx], labels[entry_idx] = result
+        self._store_results([
+            (key, (float(radii[entry_idx]), float(angles[entry_idx]), labels[entry_idx]))
+            for key, entry_idx in zip(pending_keys, pending)
+        ])
+        timer.mark("blend")
+        self._finish_call(timer, all_sentences, entries=n_entries, cache_hits=cache_hits, fast_path=fast_path_hits)
+        return radii, angles, labels
+
+
+# ----------------------------------------------------------------------
+# Incremental scoring of an entry being edited
+# ----------------------------------------------------------------------
+
+class DraftScorer:
+    """
+    Re-scores successive versions of one journal draft.
+
+    Keeps each sentence's embedding and similarity row (its cosine
+    similarities to every anchor) for the current draft. On the next call
+    only new or edited sentences are encoded; the winning sentence is
+    re-picked from the cached rows. Rows for sentences no longer in the
+    draft are dropped, so memory stays proportional to the draft itself.
+    `last_embeddings` holds the draft's sentence embeddings after each
+    call, ready to be stored without another encoder pass.
+
+    Results are identical to `ValenceEngine.calculate_polar_coordinates`.
+
+    Args:
+        engine: Engine used for encoding and blending
+    """
+
+    def __init__(self, engine: ValenceEngine):
+        self.engine = engine
+        self._rows = {}           # sentence key -> similarity row (float32)
+        self._embeddings = {}     # sentence key -> sentence embedding
+        self.last_encoded = 0     # Sentences encoded by the most recent call
+        self.last_reused = 0      # Sentences served from cached rows
+        self.last_embeddings = None  # (n_sentences, dim) for the most recent call; None after a fast-path hit
+
+    def reset(self) -> None:
+        """Forget the current draft (e.g. after it has been logged)."""
+        self._rows.clear()
+        self._embeddings.clear()
+        self.last_encoded = self.last_reused = 0
+        self.last_embeddings = None
+
+    def calculate_polar_coordinates(self, user_text: str) -> tuple[float, float, str]:
+        """
+        Score the current version of the draft.
+
+        Args:
+            user_text: Full draft text
+
+        Returns:
+            Tuple of (radius, angle_degrees, closest_emotion_name)
+        """
+        engine = self.engine
+        fast_result = None
+        self.last_embeddings = None
+        if engine.lexicon is not None and user_text and user_text.strip():
+            fast_result, verify = engine._fast_path(user_text)
+            if fast_result is not None and not verify:
+                return fast_result
+        timer = engine.profiler.start_call("draft")
+
+        valid_sentences = engine.chunk_texts([user_text])[0]
+        timer.mark("split")
+        keys = [text_key(s) for s in valid_sentences]
+
+        # Encode only sentences without a cached row (each distinct one once)
+        missing = list(dict.fromkeys(k for k in keys if k not in self._rows))
+        self.last_encoded = len(missing)
+        self.last_reused = sum(k in self._rows for k in keys)
+        if missing:
+            sentence_for_key = dict(zip(keys, valid_sentences))
+            embeddings = engine.embed_sentences([sentence_for_key[k] for k in missing])
+            timer.mark("encode")
+            similarity = engine.cosine_similarity_matrix(embeddings)
+            for key, emb, row in zip(missing, embeddings, similarity):
+                self._embeddings[key] = emb
+                self._rows[key] = row
+
+        # Drop rows of sentences that were edited away
+        current = set(keys)
+        for key in [k for k in self._rows if k not in current]:
+            del self._rows[key]
+            del self._embeddings[key]
+
+        self.last_embeddings = (
+            np.stack([self._embeddings[k] for k in keys]) if keys else engine.embed_sentences([])
+        )
+        if not valid_sentences:
+            engine._finish_call(timer, valid_sentences, encoded=0, reused=0)
+            return 0.0, 0.0, "Neutral"
+
+        # Same winning-sentence rule as the full path: first sentence on ties
+        similarity_matrix = np.stack([self._rows[k] for k in keys])
+        sentence_max_scores = similarity_matrix.max(axis=1)
+        winning_idx = int(np.argmax(sentence_max_scores))
+        timer.mark("similarity")
+
+        if sentence_max_scores[winning_idx] < engine.guardrail_threshold:
+            result = 0.0, 0.0, "Neutral"
+        else:
+            result = engine.blend_winning_row(similarity_matrix[winning_idx])
+        timer.mark("blend")
+        engine._finish_call(timer, valid_sentences, encoded=self.last_encoded, reused=self.last_reused)
+        if fast_result is not None:
+            engine._record_verification(fast_result[2], result[2])
+            return fast_result
+        return result
+
+
+# ----------------------------------------------------------------------
+# Module-level default engine (backwards-compatible helpers)
+# ----------------------------------------------------------------------
+
+_DEFAULT_ENGINE = None
+_DEFAULT_ENGINE_LOCK = threading.Lock()
+
+
+def get_default_engine() -> ValenceEngine:
+    """Return the process-wide default engine (created on first call, not loaded)."""
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        with _DEFAULT_ENGINE_LOCK:
+            if _DEFAULT_ENGINE is None:
+                _DEFAULT_ENGINE = ValenceEngine()
+    return _DEFAULT_ENGINE
+
+
+def calculate_polar_coordinates(user_text: str) -> tuple[float, float, str]:
+    """Score one entry with the default engine. See `ValenceEngine.calculate_polar_coordinates`."""
+    return get_default_engine().calculate_polar_coordinates(user_text)
+
+
+def calculate_polar_coordinates_batch(
+    texts: Iterable[str],
+    batch_size: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score many entries with the default engine. See `ValenceEngine.calculate_polar_coordinates_batch`."""
+    return get_default_engine().calculate_polar_coordinates_batch(texts, batch_size)
+
+
+def __getattr__(name: str):
+    """Lazily expose the default engine's MODEL / ANCHOR_EMBEDDINGS for old callers."""
+    if name == "MODEL":
+        return get_default_engine().model
+    if name == "ANCHOR_EMBEDDINGS":
+        return get_default_engine().anchor_embeddings
+    if name == "ANCHOR_UNIT_EMBEDDINGS":
+        return get_default_engine().anchor_unit_embeddings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,167 @@
+"""
+Bubble Wheel Figure for The Polar Emotion Compass
+==================================================
+Builds the polar bubble wheel shown in `app.py`.
+
+Kept free of Streamlit calls so the wheel can be imported (and timed by
+`benchmark.py`) outside a running app.
+
+Reruns should use `new_wheel_figure()` once per session, then
+`set_highlight()` / `set_history()`: the static bubbles and layout are
+built once per process, and each rerun only rewrites two small overlay
+traces instead of rebuilding the DataFrame and `px.scatter_polar` figure.
+"""
+
+import functools
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import pandas as pd
+from emotion_map import EMOTION_MAP
+
+# Polar axes and page layout shared by every wheel figure
+WHEEL_LAYOUT = dict(
+    polar=dict(
+        radialaxis=dict(
+            range=[0, 0.5],
+            showticklabels=True,
+            ticks="outside",
+            gridcolor="rgba(200,200,200,0.3)"
+        ),
+        angularaxis=dict(
+            direction="clockwise",
+            rotation=90,
+            tickmode="array",
+            tickvals=[0, 60, 120, 180, 240, 300],
+            ticktext=["Joy", "Anger", "Fear", "Sad", "Bad", "Peaceful"],
+            tickfont=dict(size=13)
+        ),
+        bgcolor="rgba(245,245,250,0.4)"
+    ),
+    showlegend=False,
+    height=700,
+    margin=dict(t=40, b=40),
+    paper_bgcolor="white"
+)
+
+
+# BUILD BUBBLE WHEEL DATAFRAME
+def build_wheel_df(selected_emotion):
+    """Convert EMOTION_MAP to a DataFrame with highlight color."""
+    rows = []
+    for emotion, data in EMOTION_MAP.items():
+        if emotion == "Neutral":
+            continue  # Skip neutral in the wheel
+        rows.append({
+            "emotion": emotion,
+            "radius": data["radius"],
+            "angle": data["angle"],
+            "energy": data["energy"],
+            "desc": data["desc"],
+            "color": "red" if emotion == selected_emotion else "lightblue",
+            "size": 10
+        })
+    return pd.DataFrame(rows)
+
+
+# BUILD BUBBLE WHEEL FIGURE
+def build_wheel_figure(df):
+    """Polar scatter of the wheel DataFrame with the compass layout."""
+    fig = px.scatter_polar(
+        df,
+        r="radius",
+        theta="angle",
+        color="color",
+        color_discrete_map={"red": "crimson", "lightblue": "lightskyblue"},
+        size="size",
+        size_max=18,
+        hover_name="emotion",
+        hover_data={"energy": True, "desc": True, "color": False, "size": False, "radius": ":.2f", "angle": ":.0f"},
+    )
+
+    fig.update_layout(**WHEEL_LAYOUT)
+
+    fig.update_traces(
+        marker=dict(line=dict(width=1, color="DarkSlateGrey")),
+    )
+    return fig
+
+
+# CACHED STATIC WHEEL + OVERLAYS
+_BUBBLES, _HISTORY, _HIGHLIGHT = 0, 1, 2  # Trace order: history under the highlight
+
+
+@functools.lru_cache(maxsize=1)
+def _static_wheel_figure():
+    """All bubbles unhighlighted plus empty overlay traces; built once per process."""
+    emotions = [e for e in EMOTION_MAP if e != "Neutral"]
+    bubble_marker = dict(size=18, line=dict(width=1, color="DarkSlateGrey"))
+    hover = "<b>%{hovertext}</b><br><br>radius=%{r:.2f}<br>angle=%{theta:.0f}<br>energy=%{customdata[0]}<br>desc=%{customdata[1]}<extra></extra>"
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=[EMOTION_MAP[e]["radius"] for e in emotions],
+        theta=[EMOTION_MAP[e]["angle"] for e in emotions],
+        mode="markers",
+        marker=dict(bubble_marker, color="lightskyblue"),
+        hovertext=emotions,
+        customdata=[[EMOTION_MAP[e]["energy"], EMOTION_MAP[e]["desc"]] for e in emotions],
+        hovertemplate=hover,
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[], theta=[], mode="markers",
+        marker=dict(size=7, colorscale="Purples", opacity=0.8),
+        hovertemplate="%{customdata[0]}<br>%{customdata[1]}<br>r=%{r:.2f}, θ=%{theta:.0f}°<extra>history</extra>",
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[], theta=[], mode="markers",
+        marker=dict(bubble_marker, color="crimson"),
+        hovertemplate=hover,
+    ))
+    fig.update_layout(**WHEEL_LAYOUT)
+    return fig
+
+
+def new_wheel_figure():
+    """A private copy of the static wheel for one session to update in place."""
+    return go.Figure(_static_wheel_figure())
+
+
+def set_highlight(fig, selected_emotion):
+    """Move the red highlight bubble to `selected_emotion` (cleared for Neutral/unknown)."""
+    data = EMOTION_MAP.get(selected_emotion)
+    trace = fig.data[_HIGHLIGHT]
+    if data is None or selected_emotion == "Neutral":
+        trace.update(r=[], theta=[], hovertext=[], customdata=[])
+    else:
+        trace.update(
+            r=[data["radius"]],
+            theta=[data["angle"]],
+            hovertext=[selected_emotion],
+            customdata=[[data["energy"], data["desc"]]],
+        )
+    return fig
+
+
+def set_history(fig, history=None):
+    """
+    Show logged entries on the wheel (or clear them).
+
+    Args:
+        fig: Figure from `new_wheel_figure`
+        history: Structured array from `JournalStore.query` (radius, angle,
+            emotion, ts columns), plotted without building per-row dicts
+    """
+    trace = fig.data[_HISTORY]
+    if history is None or len(history) == 0:
+        trace.update(r=[], theta=[], customdata=[])
+        return fig
+    when = history["ts"].astype("datetime64[s]").astype(str)
+    trace.update(
+        r=history["radius"],
+        theta=history["angle"],
+        customdata=np.stack([history["emotion"], when], axis=1),
+        marker=dict(color=np.arange(len(history)), cmin=-len(history) * 0.3),  # Older entries lighter
+    )
+    return fig